@@ -19,7 +19,7 @@ class GraphSerializer:
         
         Args:
             nodes: Lista de objetos Node
-            connections: Lista de tuplas (node_origem, porta_saida, node_destino, porta_entrada)
+            connections: Iterável de tuplas (node_origem, porta_saida, node_destino, porta_entrada)
             filepath: Caminho do arquivo
             
         Returns:
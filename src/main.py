@@ -23,6 +23,7 @@ matplotlib.use('Agg')
 
 import sys
 import gi
+import logging
 import numpy
 
 gi.require_version('Gtk', '4.0')
@@ -88,5 +89,7 @@ class AssetsApplication(Adw.Application):
 
 def main(version):
     """The application's entry point."""
+    # Mensagens de status da janela (logger.info: salvar, abrir, editar nós)
+    logging.basicConfig(level=logging.INFO)
     app = AssetsApplication()
     return app.run(sys.argv)
@@ -5,6 +5,24 @@ Node - Classe para desenhar e gerenciar um nó visual
 
 import cairo
 import uuid
+from dataclasses import dataclass
+
+# Fontes criadas uma vez (select_font_face resolveria a face a cada nó/frame)
+_FONT_TITLE = cairo.ToyFontFace("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD)
+_FONT_LABEL = cairo.ToyFontFace("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+
+
+@dataclass(frozen=True)
+class NodeSnapshot:
+    """
+    Cópia imutável dos campos de um nó (usada pelo clipboard).
+    Não muda se o nó original for movido ou editado depois da cópia.
+    """
+    x: float
+    y: float
+    title: str
+    num_inputs: int
+    num_outputs: int
 
 
 class Node:
@@ -20,6 +38,7 @@ class Node:
     PORT_RADIUS = 8
     PORT_SPACING = 10
     PADDING = 10
+    DRAW_MARGIN = 10  # Quanto o desenho passa da caixa (portas, brilho de seleção)
 
     # Cores
     COLOR_HEADER = (0.2, 0.4, 0.8)  # Azul
@@ -53,11 +72,8 @@ class Node:
         self.body_height = max_ports * self.HEIGHT_PORT + self.PADDING * 2
         self.total_height = self.HEIGHT_HEADER + self.body_height
 
-        # Armazenar posições das portas (calculadas no draw)
-        self.input_ports = []   # Lista de (x, y) das portas de entrada
-        self.output_ports = []  # Lista de (x, y) das portas de saída
-
         # Estado de interatividade
+        self.z = 0              # Z-order (maior = desenhado/testado por cima)
         self.selected = False   # Se o nó está selecionado
         self.hovered = False    # Se o mouse está sobre o nó
         self.dragging = False   # Se está sendo arrastado
@@ -65,13 +81,24 @@ class Node:
         self.drag_offset_y = 0
 
         # Código Python do nó
-        self._code = ""  # Armazenamento interno
+        self._code = ""         # Armazenamento interno
+        self._compiled = None   # (código, code object) compilado (ver get_function)
 
         # Sistema de cache (última execução)
         self._last_inputs = None      # Hash das últimas entradas
         self._last_outputs = None     # Resultados da última execução
         self._cache_valid = False     # Flag de validade do cache
 
+    @property
+    def input_ports(self):
+        """Lista de (x, y) das portas de entrada (derivada da posição do nó)"""
+        return [self.get_input_port_position(i) for i in range(self.num_inputs)]
+
+    @property
+    def output_ports(self):
+        """Lista de (x, y) das portas de saída (derivada da posição do nó)"""
+        return [self.get_output_port_position(i) for i in range(self.num_outputs)]
+
     @property
     def code(self):
         """Retorna o código Python do nó"""
@@ -100,16 +127,13 @@ class Node:
         # 2. Desenhar header
         self._draw_header(context)
 
-        # 3. Desenhar portas de entrada (esquerda)
-        self._draw_input_ports(context)
-
-        # 4. Desenhar portas de saída (direita)
-        self._draw_output_ports(context)
+        # 3. Desenhar portas de entrada (esquerda) e de saída (direita)
+        self._draw_ports(context)
 
-        # 5. Desenhar borda (muda se selecionado/hover)
+        # 4. Desenhar borda (muda se selecionado/hover)
         self._draw_border(context)
 
-        # 6. Desenhar indicador de seleção (se selecionado)
+        # 5. Desenhar indicador de seleção (se selecionado)
         if self.selected:
             self._draw_selection_indicator(context)
 
@@ -138,7 +162,7 @@ class Node:
 
         # Texto do título
         context.set_source_rgb(*self.COLOR_TEXT)
-        context.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD)
+        context.set_font_face(_FONT_TITLE)
         context.set_font_size(14)
 
         # Centralizar texto
@@ -149,71 +173,44 @@ class Node:
         context.move_to(text_x, text_y)
         context.show_text(self.title)
 
-    def _draw_input_ports(self, context):
-        """Desenha portas de entrada (bolinhas à esquerda)"""
-        self.input_ports.clear()
-
-        for i in range(self.num_inputs):
-            # Calcular posição Y da porta
-            port_y = (self.y + self.HEIGHT_HEADER + self.PADDING +
-                     i * self.HEIGHT_PORT + self.HEIGHT_PORT / 2)
-            port_x = self.x  # Exatamente na borda esquerda
-
-            # Desenhar bolinha
-            context.set_source_rgb(*self.COLOR_PORT)
-            context.arc(port_x, port_y, self.PORT_RADIUS, 0, 2 * 3.14159)
-            context.fill()
-
-            # Borda da bolinha
-            context.set_source_rgb(*self.COLOR_BORDER)
-            context.set_line_width(2)
-            context.arc(port_x, port_y, self.PORT_RADIUS, 0, 2 * 3.14159)
-            context.stroke()
-
-            # Label da porta
-            context.set_source_rgb(*self.COLOR_TEXT_BODY)
-            context.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
-            context.set_font_size(11)
-            label = f"in[{i}]"
-            context.move_to(port_x + self.PORT_RADIUS + 8, port_y + 4)
-            context.show_text(label)
-
-            # Guardar posição
-            self.input_ports.append((port_x, port_y))
-
-    def _draw_output_ports(self, context):
-        """Desenha portas de saída (bolinhas à direita)"""
-        self.output_ports.clear()
-
-        for i in range(self.num_outputs):
-            # Calcular posição Y da porta
-            port_y = (self.y + self.HEIGHT_HEADER + self.PADDING +
-                     i * self.HEIGHT_PORT + self.HEIGHT_PORT / 2)
-            port_x = self.x + self.WIDTH  # Exatamente na borda direita
-
-            # Desenhar bolinha
-            context.set_source_rgb(*self.COLOR_PORT)
-            context.arc(port_x, port_y, self.PORT_RADIUS, 0, 2 * 3.14159)
-            context.fill()
-
-            # Borda da bolinha
-            context.set_source_rgb(*self.COLOR_BORDER)
-            context.set_line_width(2)
-            context.arc(port_x, port_y, self.PORT_RADIUS, 0, 2 * 3.14159)
-            context.stroke()
+    def _draw_ports(self, context):
+        """
+        Desenha as portas: bolinhas de entrada (esquerda) e saída (direita).
+        Todas as bolinhas vão num único path (um fill e um stroke por nó)
+        e a fonte dos labels é definida uma vez só.
+        """
+        input_ports = self.input_ports
+        output_ports = self.output_ports
+        if not input_ports and not output_ports:
+            return
+
+        # Bolinhas
+        radius = self.PORT_RADIUS
+        for port_x, port_y in input_ports + output_ports:
+            context.new_sub_path()
+            context.arc(port_x, port_y, radius, 0, 2 * 3.14159)
+        context.set_source_rgb(*self.COLOR_PORT)
+        context.fill_preserve()
+
+        # Borda das bolinhas (mesmo path)
+        context.set_source_rgb(*self.COLOR_BORDER)
+        context.set_line_width(2)
+        context.stroke()
 
-            # Label da porta (à esquerda da bolinha)
-            context.set_source_rgb(*self.COLOR_TEXT_BODY)
-            context.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
-            context.set_font_size(11)
+        # Labels das portas
+        context.set_source_rgb(*self.COLOR_TEXT_BODY)
+        context.set_font_face(_FONT_LABEL)
+        context.set_font_size(11)
+        for i, (port_x, port_y) in enumerate(input_ports):
+            context.move_to(port_x + radius + 8, port_y + 4)
+            context.show_text(f"in[{i}]")
+        for i, (port_x, port_y) in enumerate(output_ports):
+            # Label à esquerda da bolinha
             label = f"out[{i}]"
             extents = context.text_extents(label)
-            context.move_to(port_x - extents.width - self.PORT_RADIUS - 8, port_y + 4)
+            context.move_to(port_x - extents.width - radius - 8, port_y + 4)
             context.show_text(label)
 
-            # Guardar posição
-            self.output_ports.append((port_x, port_y))
-
     def _draw_border(self, context):
         """Desenha borda ao redor do nó inteiro (muda com hover/seleção)"""
         # Escolher cor e espessura baseado no estado
@@ -297,8 +294,14 @@ class Node:
 
         Args:
             selected: bool
+
+        Returns:
+            bool: True se o estado mudou
         """
+        if self.selected == selected:
+            return False
         self.selected = selected
+        return True
 
     def set_hovered(self, hovered):
         """
@@ -306,8 +309,14 @@ class Node:
 
         Args:
             hovered: bool
+
+        Returns:
+            bool: True se o estado mudou
         """
+        if self.hovered == hovered:
+            return False
         self.hovered = hovered
+        return True
 
     def move_to(self, x, y):
         """
@@ -320,18 +329,85 @@ class Node:
         self.x = x
         self.y = y
 
+    def snapshot(self):
+        """
+        Retorna uma cópia imutável do estado atual do nó.
+
+        Returns:
+            NodeSnapshot: Posição, título e número de portas do nó
+        """
+        return NodeSnapshot(
+            x=self.x,
+            y=self.y,
+            title=self.title,
+            num_inputs=self.num_inputs,
+            num_outputs=self.num_outputs
+        )
+
+    def _port_y(self, index):
+        """Posição Y da porta de índice `index` (mesma para entrada e saída)"""
+        return (self.y + self.HEIGHT_HEADER + self.PADDING +
+                index * self.HEIGHT_PORT + self.HEIGHT_PORT / 2)
+
     def get_input_port_position(self, index):
         """Retorna posição (x, y) de uma porta de entrada"""
-        if 0 <= index < len(self.input_ports):
-            return self.input_ports[index]
+        if 0 <= index < self.num_inputs:
+            return (self.x, self._port_y(index))  # Exatamente na borda esquerda
         return None
 
     def get_output_port_position(self, index):
         """Retorna posição (x, y) de uma porta de saída"""
-        if 0 <= index < len(self.output_ports):
-            return self.output_ports[index]
+        if 0 <= index < self.num_outputs:
+            return (self.x + self.WIDTH, self._port_y(index))  # Exatamente na borda direita
         return None
 
+    def _port_at(self, port_x, count, x, y, radius2):
+        """
+        Índice da porta (de uma coluna de `count` portas em `port_x`) a até
+        sqrt(radius2) de (x, y), ou None. As portas ficam numa coluna com
+        espaçamento fixo, então só a porta mais próxima em Y precisa ser
+        testada - O(1), sem percorrer as portas.
+        """
+        # Rejeição rápida: longe da coluna das portas (caso comum nos cliques)
+        dx = x - port_x
+        if count == 0 or dx * dx > radius2:
+            return None
+
+        first_y = self.y + self.HEIGHT_HEADER + self.PADDING + self.HEIGHT_PORT / 2
+        index = round((y - first_y) / self.HEIGHT_PORT)
+        index = 0 if index < 0 else (count - 1 if index >= count else index)
+
+        dy = y - (first_y + index * self.HEIGHT_PORT)
+        if dx * dx + dy * dy <= radius2:
+            return index
+        return None
+
+    def input_port_at(self, x, y, radius2):
+        """
+        Porta de entrada sob o ponto (x, y).
+
+        Args:
+            x, y: Ponto a testar (coordenadas do canvas)
+            radius2: Raio de clique ao quadrado
+
+        Returns:
+            int: Índice da porta, ou None se nenhuma estiver perto
+        """
+        return self._port_at(self.x, self.num_inputs, x, y, radius2)
+
+    def output_port_at(self, x, y, radius2):
+        """
+        Porta de saída sob o ponto (x, y).
+
+        Args:
+            x, y: Ponto a testar (coordenadas do canvas)
+            radius2: Raio de clique ao quadrado
+
+        Returns:
+            int: Índice da porta, ou None se nenhuma estiver perto
+        """
+        return self._port_at(self.x + self.WIDTH, self.num_outputs, x, y, radius2)
+
     def _hash_inputs(self, inputs):
         """
         Gera hash das entradas para comparação de cache.
@@ -391,6 +467,35 @@ class Node:
         import sys
         print(f"⚙️ Executado e cacheado: {self.title}", file=sys.__stdout__)
 
+    def get_function(self):
+        """
+        Retorna o código do nó compilado como uma função `f(inputs)`.
+        O código é escrito como corpo de função (com return); a compilação
+        é feita uma vez e reaproveitada até o código mudar.
+
+        Chamado pela thread de execução: o cache guarda o par (código, code
+        object) numa única atribuição, então uma edição concorrente nunca
+        fica associada à compilação antiga. Cada chamada cria a função num
+        namespace novo, para que globals de uma execução não vazem para a
+        seguinte.
+
+        Returns:
+            function: Função do nó
+        """
+        code = self._code
+        compiled = self._compiled
+        if compiled is None or compiled[0] != code:
+            # Indenta todas as linhas (inclusive as vazias, que podem estar
+            # dentro de strings multilinha) sem quebrar o código em lista
+            source = ("def __node_function(inputs):\n    " +
+                      code.replace("\n", "\n    ") + "\n")
+            compiled = (code, compile(source, f"<node {self.title}>", "exec"))
+            self._compiled = compiled
+
+        namespace = {'__builtins__': __builtins__}
+        exec(compiled[1], namespace)
+        return namespace['__node_function']
+
     def invalidate_cache(self):
         """
         Invalida o cache, forçando recálculo na próxima execução.
@@ -7,6 +7,8 @@ import json
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from .node import Node
+
 
 class NodeLibrary:
     """Gerenciador de biblioteca de nós carregada de arquivos JSON"""
@@ -64,6 +66,12 @@ class NodeLibrary:
 
             # Adiciona nós da categoria
             nodes = category_data.get("nodes", [])
+            for template in nodes:
+                # default_code pode vir como array de linhas: juntar uma vez
+                # aqui, e não a cada nó criado a partir do template
+                code = template.get("default_code", "")
+                if isinstance(code, list):
+                    template["default_code"] = "\n".join(code)
             self.library[category_name]["nodes"].extend(nodes)
 
             print(f"  ✓ {category_name}: {len(nodes)} nó(s) de {filepath.name}")
@@ -216,8 +224,6 @@ def create_node_from_template(template, x, y):
     Returns:
         Node object
     """
-    from .node import Node
-
     node = Node(
         x=x,
         y=y,
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+spatial_index.py - Índices espaciais para hit-testing e culling no canvas
+Evita percorrer todos os nós (um por um, em Python) a cada evento ou frame
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+
+class SpatialHash:
+    """
+    Grade uniforme (spatial hash) de retângulos.
+    Cada célula guarda os itens cujo retângulo toca a célula, então uma
+    consulta por ponto só olha os itens de uma célula.
+    """
+
+    def __init__(self, cell_size=128):
+        """
+        Inicializa o índice vazio.
+
+        Args:
+            cell_size: Tamanho (lado) de cada célula, em coordenadas do canvas
+        """
+        self.cell_size = cell_size
+        self._cells = defaultdict(set)  # (cx, cy) -> itens na célula
+        self._item_cells = {}           # item -> células ocupadas pelo item
+
+    def _cells_for_rect(self, x0, y0, x1, y1):
+        """Retorna as células (cx, cy) que um retângulo toca"""
+        size = self.cell_size
+        cx0, cx1 = int(x0 // size), int(x1 // size)
+        cy0, cy1 = int(y0 // size), int(y1 // size)
+        return tuple(
+            (cx, cy)
+            for cx in range(cx0, cx1 + 1)
+            for cy in range(cy0, cy1 + 1)
+        )
+
+    def insert(self, item, x0, y0, x1, y1):
+        """
+        Insere (ou reposiciona) um item com o retângulo dado.
+
+        Args:
+            item: Objeto a indexar (precisa ser hashable)
+            x0, y0: Canto superior esquerdo
+            x1, y1: Canto inferior direito
+        """
+        cells = self._cells_for_rect(x0, y0, x1, y1)
+        old_cells = self._item_cells.get(item)
+        if old_cells == cells:
+            return  # Continua nas mesmas células - nada a fazer
+
+        if old_cells is not None:
+            self._unlink(item, old_cells)
+
+        for cell in cells:
+            self._cells[cell].add(item)
+        self._item_cells[item] = cells
+
+    def remove(self, item):
+        """Remove um item do índice (ignora se não estiver indexado)"""
+        cells = self._item_cells.pop(item, None)
+        if cells is not None:
+            self._unlink(item, cells)
+
+    def _unlink(self, item, cells):
+        """Tira o item das células dadas, descartando células vazias"""
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(item)
+                if not bucket:
+                    del self._cells[cell]
+
+    def clear(self):
+        """Remove todos os itens"""
+        self._cells.clear()
+        self._item_cells.clear()
+
+    def query_point(self, x, y):
+        """
+        Retorna os itens candidatos a conter o ponto (x, y).
+        O chamador ainda precisa fazer o teste exato.
+
+        Returns:
+            set: Itens da célula do ponto (não modificar)
+        """
+        size = self.cell_size
+        return self._cells.get((int(x // size), int(y // size)), ())
+
+    def __contains__(self, item):
+        return item in self._item_cells
+
+    def __len__(self):
+        return len(self._item_cells)
+
+
+class RectArray:
+    """
+    Retângulos guardados como arrays NumPy (estrutura de arrays).
+    Testes contra todos os retângulos viram uma única operação vetorizada,
+    sem chamar um método Python por item.
+    """
+
+    def __init__(self, capacity=64):
+        """
+        Inicializa o array vazio.
+
+        Args:
+            capacity: Número inicial de linhas reservadas (cresce sob demanda)
+        """
+        self._rects = np.empty((capacity, 4), dtype=np.float64)  # x0, y0, x1, y1
+        self._items = []  # Linha -> item
+        self._rows = {}   # Item -> linha
+
+    def set(self, item, x0, y0, x1, y1):
+        """
+        Insere (ou atualiza) o retângulo de um item.
+
+        Args:
+            item: Objeto a guardar (precisa ser hashable)
+            x0, y0: Canto superior esquerdo
+            x1, y1: Canto inferior direito
+        """
+        row = self._rows.get(item)
+        if row is None:
+            row = len(self._items)
+            if row == len(self._rects):
+                # Dobrar a capacidade (custo amortizado constante)
+                grown = np.empty((row * 2, 4), dtype=np.float64)
+                grown[:row] = self._rects
+                self._rects = grown
+            self._items.append(item)
+            self._rows[item] = row
+        self._rects[row] = (x0, y0, x1, y1)
+
+    def remove(self, item):
+        """Remove um item (ignora se não existir). Move a última linha para o buraco."""
+        row = self._rows.pop(item, None)
+        if row is None:
+            return
+
+        last = len(self._items) - 1
+        if row != last:
+            moved = self._items[last]
+            self._items[row] = moved
+            self._rects[row] = self._rects[last]
+            self._rows[moved] = row
+        self._items.pop()
+
+    def clear(self):
+        """Remove todos os itens (mantém a capacidade reservada)"""
+        self._items.clear()
+        self._rows.clear()
+
+    def query_rect(self, x0, y0, x1, y1):
+        """
+        Retorna os itens cujo retângulo intersecta o retângulo dado.
+
+        Args:
+            x0, y0: Canto superior esquerdo
+            x1, y1: Canto inferior direito
+
+        Returns:
+            list: Itens que tocam o retângulo (sem ordem definida)
+        """
+        rects = self._rects[:len(self._items)]
+        hit = ((rects[:, 2] >= x0) & (rects[:, 0] <= x1) &
+               (rects[:, 3] >= y0) & (rects[:, 1] <= y1))
+        items = self._items
+        return [items[row] for row in np.flatnonzero(hit)]
+
+    def __contains__(self, item):
+        return item in self._rows
+
+    def __len__(self):
+        return len(self._items)
@@ -21,36 +21,143 @@ from gi.repository import Adw
 from gi.repository import Gtk
 from gi.repository import Gdk
 from gi.repository import Gio
+from gi.repository import GLib
+from gi.repository import GObject
+from gi.repository import Pango
 
 import cairo
+import logging
+import numpy as np
 from pathlib import Path
+from collections import defaultdict, deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .node import Node
 from .node_dialogs import CodeEditorDialog, RenameNodeDialog, NodePropertiesDialog, SaveToLibraryDialog
 from .graph_io import GraphSerializer, get_default_save_directory
-from .node_library import _get_library
+from .node_library import _get_library, create_node_from_template
 from .output_panel import OutputPanel
+from .spatial_index import SpatialHash, RectArray
+
+logger = logging.getLogger(__name__)
+
+# Teclas e modificadores como ints simples (sem lookup no gi a cada evento)
+_KEY_C = Gdk.KEY_c
+_KEY_V = Gdk.KEY_v
+_KEY_D = Gdk.KEY_d
+_KEY_E = Gdk.KEY_e
+_KEY_R = Gdk.KEY_r
+_KEY_P = Gdk.KEY_p
+_KEY_TAB = Gdk.KEY_Tab
+_KEY_LEFT_TAB = Gdk.KEY_ISO_Left_Tab  # O que Shift+TAB costuma gerar
+_KEY_ESCAPE = Gdk.KEY_Escape
+_KEY_DELETE = Gdk.KEY_Delete
+_KEY_LEFT = Gdk.KEY_Left
+_KEY_RIGHT = Gdk.KEY_Right
+_KEY_UP = Gdk.KEY_Up
+_KEY_DOWN = Gdk.KEY_Down
+_CTRL = int(Gdk.ModifierType.CONTROL_MASK)
+_SHIFT = int(Gdk.ModifierType.SHIFT_MASK)
+_MODS = _CTRL | _SHIFT  # Únicos modificadores que importam nos atalhos
+
+# Base de Bernstein da Bezier cúbica nos t amostrados do hit-test de conexões
+_BEZ_SAMPLES = 20
+_BEZ_T = np.linspace(0.0, 1.0, _BEZ_SAMPLES + 1)
+_BEZ_U = 1.0 - _BEZ_T
+_BEZ_B0 = _BEZ_U ** 3
+_BEZ_B1 = 3 * _BEZ_U ** 2 * _BEZ_T
+_BEZ_B2 = 3 * _BEZ_U * _BEZ_T ** 2
+_BEZ_B3 = _BEZ_T ** 3
+
+# Markup fixo do painel da biblioteca, interpretado uma única vez
+_, _LIBRARY_HEADER_ATTRS, _LIBRARY_HEADER_TEXT, _ = Pango.parse_markup(
+    "<b>Node Library</b>", -1, "\0")
+_, _LIBRARY_FOOTER_ATTRS, _LIBRARY_FOOTER_TEXT, _ = Pango.parse_markup(
+    "<small>Click to add node to center</small>", -1, "\0")
+
+# Linhas da biblioteca sem sombra, cantos arredondados nem transições:
+# cada um desses efeitos custa caminhos extras no snapshot de cada linha
+_LIBRARY_CSS = """
+.node-template > row {
+    border-radius: 0;
+    box-shadow: none;
+    transition: none;
+    padding: 2px;
+}
+"""
+_library_css_installed = False
+
+
+def _install_library_css(display):
+    """Registra (uma única vez) o CSS das linhas da biblioteca no display"""
+    global _library_css_installed
+    if _library_css_installed or display is None:
+        return
+
+    provider = Gtk.CssProvider()
+    provider.load_from_data(_LIBRARY_CSS, -1)
+    Gtk.StyleContext.add_provider_for_display(
+        display, provider, Gtk.STYLE_PROVIDER_PRIORITY_USER)
+    _library_css_installed = True
+
 
 class AssetsCanvas(Gtk.DrawingArea):
     """Canvas que desenha os nós"""
 
+    # Estilos das conexões: (largura da linha, cor rgba)
+    CONNECTION_STYLE_NORMAL = (3, (0.3, 0.6, 0.9, 0.8))     # Azul normal
+    CONNECTION_STYLE_SELECTED = (4, (1.0, 0.3, 0.3, 0.9))   # Vermelho para selecionada
+
+    PORT_CLICK_RADIUS = 12  # Raio de detecção ao redor das portas
+    _PORT_R2 = PORT_CLICK_RADIUS * PORT_CLICK_RADIUS  # Compara distâncias ao quadrado (sem raiz)
+    NODE_INDEX_CELL = 128   # Tamanho da célula do índice espacial de nós
+
+    GRID_SIZE = 20                    # Espaçamento do grid de fundo (canvas)
+    GRID_COLOR = (0.96, 0.96, 0.96)   # Cinza bem claro
+
+    INFO_PADDING = 2  # Folga horizontal da imagem do texto de info
+
     def __init__(self):
         super().__init__()
         self.set_draw_func(self.on_draw)
 
+        # Metade do tamanho alocado (centro da vista), atualizada no "resize"
+        self._half_width = 0
+        self._half_height = 0
+        self.connect("resize", self.on_resize)
+
         # Criar alguns nós de exemplo
         self.nodes = []
+        self._node_pos = {}  # Nó -> posição em self.nodes (busca/remoção O(1))
+
+        # Índice espacial dos nós (retângulo + raio das portas) para hit-testing
+        self._node_index = SpatialHash(self.NODE_INDEX_CELL)
+        self._node_bounds = RectArray()  # Retângulos dos nós (NumPy) para culling no draw
+        self._z_counter = 0  # Último z-order atribuído (maior = mais em cima)
+        self._nodes_order_dirty = False  # self.nodes fora da ordem de z?
 
         # Armazenar conexões como: (nó_origem, porta_saída, nó_destino, porta_entrada)
         # Guarda REFERÊNCIAS aos nós, não índices!
-        self.connections = []
+        # dict usado como conjunto ordenado: busca e remoção O(1) mantendo a
+        # ordem de criação (importa para portas com várias conexões).
+        # Valor: geometria da conexão em cache (None = recalcular, ver
+        # _connection_geometry)
+        self.connections = {}
+
+        # Adjacência: nó -> conjunto das conexões que saem dele / que chegam nele
+        self._outgoing = defaultdict(set)
+        self._incoming = defaultdict(set)
+
+        # Plano de execução (níveis + conexões de entrada) em cache; só é
+        # lido/escrito na main thread (None = recalcular)
+        self._execution_plan = None
 
         # Estado de interação
         self.dragging_node = None
         self.hovered_node = None
-        self.focused_node_index = -1  # Índice do nó com foco (-1 = nenhum)
-        self.clipboard_node = None  # Nó copiado para clipboard
+        self.selected_node = None  # Único nó selecionado (None = nenhum)
+        self.focused_node = None  # Nó com foco (None = nenhum)
+        self.clipboard_node = None  # NodeSnapshot copiado para clipboard
 
         # Estado para criar conexões
         self.creating_connection = False  # Está criando uma conexão?
@@ -60,13 +167,35 @@ class AssetsCanvas(Gtk.DrawingArea):
         self.selected_connection = None  # Conexão selecionada (tupla ou None)
 
         # Estado de zoom e pan
-        self.zoom_level = 1.0  # 1.0 = 100%, 0.5 = 50%, 2.0 = 200%
+        self.zoom_level = 1.0  # 1.0 = 100%, 0.5 = 50%, 2.0 = 200% (também define _inv_zoom)
         self.pan_offset_x = 0  # Offset horizontal do canvas
         self.pan_offset_y = 0  # Offset vertical do canvas
+        self._pointer_pos = None  # Última posição do mouse no widget (âncora do zoom)
         self.panning = False  # Está arrastando o canvas?
         self.pan_start_x = 0
         self.pan_start_y = 0
 
+        # Grid de fundo: uma célula desenhada numa imagem e repetida
+        self._grid_pattern = None
+        self._grid_pattern_key = None  # (zoom, fator de escala da tela)
+        # Com zoom > 1: path das linhas visíveis, guardado por (zoom, intervalo)
+        self._grid_path = None
+        self._grid_path_key = None
+        self._grid_view_key = None  # (pan, zoom, tamanho) do último cálculo do intervalo
+
+        # Texto de info (zoom/pan) rasterizado uma vez e reaproveitado
+        self._info_surface = None
+        self._info_key = None
+
+        # Redesenho agrupado: vários pedidos no mesmo frame viram um queue_draw
+        self._redraw_tick_id = None
+
+        # Movimento do mouse/arraste processado uma vez por frame: só a
+        # última posição recebida entre dois frames é usada
+        self._input_tick_id = None
+        self._pending_motion = None  # (x, y) no widget
+        self._pending_drag = None    # (x, y) no widget do nó sendo arrastado
+
         # Configurar eventos de mouse
         self._setup_mouse_events()
 
@@ -123,6 +252,40 @@ class AssetsCanvas(Gtk.DrawingArea):
         self.set_can_focus(True)
         self.set_focusable(True)
 
+        # Atalhos: (tecla, state & (Ctrl|Shift)) -> ação
+        # Uma ação que retorna False não processou a tecla (deixa propagar)
+        move_speed = 10  # pixels por tecla
+        with_ctrl = (_CTRL, _CTRL | _SHIFT)
+        without_ctrl = (0, _SHIFT)
+        any_mods = with_ctrl + without_ctrl
+        shortcuts = [
+            # Ctrl+C / Ctrl+V / Ctrl+D - Copiar / Colar / Duplicar
+            (_KEY_C, with_ctrl, self._copy_focused_node),
+            (_KEY_V, with_ctrl, self._paste_node),
+            (_KEY_D, with_ctrl, self._duplicate_focused_node),
+            # E / R / P - Editar código / Renomear / Propriedades do nó focado
+            (_KEY_E, without_ctrl, lambda: self._open_focused_node_dialog(self.edit_node_code)),
+            (_KEY_R, without_ctrl, lambda: self._open_focused_node_dialog(self.rename_node)),
+            (_KEY_P, without_ctrl, lambda: self._open_focused_node_dialog(self.show_node_properties)),
+            # TAB - Próximo nó / Shift+TAB - Nó anterior
+            (_KEY_TAB, (0, _CTRL), self._focus_next_node),
+            (_KEY_TAB, (_SHIFT, _CTRL | _SHIFT), self._focus_previous_node),
+            (_KEY_LEFT_TAB, any_mods, self._focus_previous_node),
+            # Escape - Deselecionar tudo / Delete - Remover nó focado OU conexão
+            (_KEY_ESCAPE, any_mods, self._clear_selection),
+            (_KEY_DELETE, any_mods, self._delete_selection),
+            # Setas - Mover nó focado
+            (_KEY_LEFT, any_mods, lambda: self._move_focused_node(-move_speed, 0)),
+            (_KEY_RIGHT, any_mods, lambda: self._move_focused_node(move_speed, 0)),
+            (_KEY_UP, any_mods, lambda: self._move_focused_node(0, -move_speed)),
+            (_KEY_DOWN, any_mods, lambda: self._move_focused_node(0, move_speed)),
+        ]
+        self._key_handlers = {
+            (keyval, mods): action
+            for keyval, mods_list, action in shortcuts
+            for mods in mods_list
+        }
+
         # Controlador de teclado
         key_controller = Gtk.EventControllerKey.new()
         key_controller.connect("key-pressed", self.on_key_pressed)
@@ -131,6 +294,31 @@ class AssetsCanvas(Gtk.DrawingArea):
         # Dar foco inicial ao canvas
         self.grab_focus()
 
+    def on_resize(self, area, width, height):
+        """Guarda o centro da área alocada (evita consultar o tamanho a cada uso)"""
+        self._half_width = width * 0.5
+        self._half_height = height * 0.5
+
+    def get_view_center(self):
+        """
+        Retorna o centro da área visível.
+
+        Returns:
+            tuple: (x, y) em coordenadas do canvas
+        """
+        return self._screen_to_canvas(self._half_width, self._half_height)
+
+    @property
+    def zoom_level(self):
+        """Nível de zoom: 1.0 = 100%, 0.5 = 50%, 2.0 = 200%"""
+        return self._zoom_level
+
+    @zoom_level.setter
+    def zoom_level(self, zoom):
+        """Define o zoom e o inverso pré-calculado (multiplicar em vez de dividir)"""
+        self._zoom_level = zoom
+        self._inv_zoom = 1.0 / zoom
+
     def _screen_to_canvas(self, screen_x, screen_y):
         """
         Converte coordenadas da tela para coordenadas do canvas (com zoom e pan).
@@ -141,9 +329,9 @@ class AssetsCanvas(Gtk.DrawingArea):
         Returns:
             tuple: (canvas_x, canvas_y)
         """
-        canvas_x = (screen_x - self.pan_offset_x) / self.zoom_level
-        canvas_y = (screen_y - self.pan_offset_y) / self.zoom_level
-        return (canvas_x, canvas_y)
+        inv_zoom = self._inv_zoom
+        return ((screen_x - self.pan_offset_x) * inv_zoom,
+                (screen_y - self.pan_offset_y) * inv_zoom)
 
     def _canvas_to_screen(self, canvas_x, canvas_y):
         """
@@ -155,9 +343,9 @@ class AssetsCanvas(Gtk.DrawingArea):
         Returns:
             tuple: (screen_x, screen_y)
         """
-        screen_x = canvas_x * self.zoom_level + self.pan_offset_x
-        screen_y = canvas_y * self.zoom_level + self.pan_offset_y
-        return (screen_x, screen_y)
+        zoom = self.zoom_level
+        return (canvas_x * zoom + self.pan_offset_x,
+                canvas_y * zoom + self.pan_offset_y)
 
     def on_mouse_pressed(self, gesture, n_press, x, y):
         """Quando o mouse é pressionado"""
@@ -172,31 +360,28 @@ class AssetsCanvas(Gtk.DrawingArea):
 
         # Botão direito: mostrar menu de contexto
         if button == 3:  # Botão direito
-            print(f"🖱️  Botão direito em ({canvas_x:.0f}, {canvas_y:.0f})")
             # Verificar se clicou em um nó
-            for node in reversed(self.nodes):
-                if node.contains_point(canvas_x, canvas_y):
-                    print(f"✓ Nó encontrado: {node.title}")
-                    self._show_node_context_menu(node, x, y)
-                    return
-            print("⚠️  Nenhum nó no ponto clicado")
+            node = self._node_at(canvas_x, canvas_y)
+            if node is not None:
+                self._show_node_context_menu(node, x, y)
+                return
             return
 
         # Botão esquerdo: lógica existente
-#        print(f"Click em tela ({x:.0f}, {y:.0f}) → canvas ({canvas_x:.0f}, {canvas_y:.0f})")
+        # Só os nós perto do ponto (índice espacial), do topo para baixo
+        candidates = self._nodes_at(canvas_x, canvas_y)
 
         # Primeiro, verificar se clicou em uma porta de ENTRADA (para remover conexões - Opção C)
-        for node in reversed(self.nodes):
+        for node in candidates:
             port_index = self._get_input_port_at(node, canvas_x, canvas_y)
             if port_index is not None:
                 # Clicou em porta de entrada - remover todas conexões dessa porta
- #               print(f"👆 Clicou em porta de ENTRADA: {node.title}.in[{port_index}]")
                 self._remove_connections_to_input_port(node, port_index)
-                self.queue_draw()
+                self.request_redraw()
                 return
 
         # Segundo, verificar se clicou em uma porta de SAÍDA (para criar conexão)
-        for node in reversed(self.nodes):
+        for node in candidates:
             port_index = self._get_output_port_at(node, canvas_x, canvas_y)
             if port_index is not None:
                 # Clicou em uma porta de saída - iniciar criação de conexão
@@ -204,50 +389,40 @@ class AssetsCanvas(Gtk.DrawingArea):
                 self.connection_start_node = node
                 self.connection_start_port = port_index
                 self.connection_mouse_pos = (canvas_x, canvas_y)
-  #              print(f"🔗 Iniciando conexão de {node.title}.out[{port_index}]")
-                self.queue_draw()
+                self.request_redraw()
                 return
 
         # Terceiro, verificar se clicou em uma CONEXÃO (linha - Opção A)
         clicked_connection = self._get_connection_at_point(canvas_x, canvas_y)
         if clicked_connection:
             self.selected_connection = clicked_connection
-   #         print(f"🔗 Conexão selecionada: {clicked_connection[0].title}.out[{clicked_connection[1]}] → {clicked_connection[2].title}.in[{clicked_connection[3]}]")
-            self.queue_draw()
+            self.request_redraw()
             return
         else:
             # Não clicou em conexão - limpar seleção de conexão
             self.selected_connection = None
 
         # Quarto, verificar se clicou em algum nó (corpo do nó, não porta)
-        clicked_node = None
-        for node in reversed(self.nodes):
-            if node.contains_point(canvas_x, canvas_y):
-                clicked_node = node
-                break
+        clicked_node = self._node_at(canvas_x, canvas_y)
 
-        # Desselecionar todos
-        for node in self.nodes:
-            node.set_selected(False)
+        # Selecionar o clicado (ou nenhum) - só o nó anterior é desmarcado
+        self.select_node(clicked_node)
 
-        # Selecionar o clicado e trazer para frente (z-order)
+        # Trazer o clicado para frente (z-order)
         if clicked_node:
-            clicked_node.set_selected(True)
-    #        print(f"  → Selecionou: {clicked_node.title}")
-
             # Z-order: mover nó para o final da lista (desenha por último = fica em cima)
             self.bring_to_front(clicked_node)
 
-            # Atualizar índice de foco para o nó clicado
-            self.focused_node_index = self.nodes.index(clicked_node)
+            # Foco vai para o nó clicado
+            self.focused_node = clicked_node
         else:
             # Clicou no vazio - iniciar pan (arrastar canvas)
             self.panning = True
             self.pan_start_x = x
             self.pan_start_y = y
-            self.focused_node_index = -1
+            self.focused_node = None
 
-        self.queue_draw()
+        self.request_redraw()
 
     def on_scroll(self, controller, dx, dy):
         """
@@ -266,14 +441,24 @@ class AssetsCanvas(Gtk.DrawingArea):
         old_zoom = self.zoom_level
 
         if dy < 0:  # Scroll up = zoom in
-            self.zoom_level = min(self.zoom_level * (1 + zoom_speed), 3.0)  # Max 300%
+            new_zoom = min(old_zoom * (1 + zoom_speed), 3.0)  # Max 300%
         else:  # Scroll down = zoom out
-            self.zoom_level = max(self.zoom_level * (1 - zoom_speed), 0.3)  # Min 30%
+            new_zoom = max(old_zoom * (1 - zoom_speed), 0.3)  # Min 30%
 
-        if old_zoom != self.zoom_level:
-#            print(f"🔍 Zoom: {self.zoom_level * 100:.0f}%")
-            self.queue_draw()
+        if new_zoom == old_zoom:
+            return True  # Já no limite - nada muda, nada a redesenhar
 
+        # Manter fixo o ponto do canvas sob o mouse (ou o centro da tela)
+        if self._pointer_pos is not None:
+            anchor_x, anchor_y = self._pointer_pos
+        else:
+            anchor_x, anchor_y = self._half_width, self._half_height
+        ratio = new_zoom / old_zoom
+        self.pan_offset_x = anchor_x - (anchor_x - self.pan_offset_x) * ratio
+        self.pan_offset_y = anchor_y - (anchor_y - self.pan_offset_y) * ratio
+        self.zoom_level = new_zoom
+
+        self.request_redraw()
         return True
 
     def _get_output_port_at(self, node, x, y):
@@ -287,14 +472,7 @@ class AssetsCanvas(Gtk.DrawingArea):
         Returns:
             int: Índice da porta (0, 1, 2...) ou None se não clicou em porta
         """
-        port_click_radius = 12  # Raio de detecção ao redor da porta
-
-        for i, (port_x, port_y) in enumerate(node.output_ports):
-            distance = ((x - port_x) ** 2 + (y - port_y) ** 2) ** 0.5
-            if distance <= port_click_radius:
-                return i
-
-        return None
+        return node.output_port_at(x, y, self._PORT_R2)
 
     def _get_input_port_at(self, node, x, y):
         """
@@ -307,14 +485,7 @@ class AssetsCanvas(Gtk.DrawingArea):
         Returns:
             int: Índice da porta (0, 1, 2...) ou None se não clicou em porta
         """
-        port_click_radius = 12  # Raio de detecção ao redor da porta
-
-        for i, (port_x, port_y) in enumerate(node.input_ports):
-            distance = ((x - port_x) ** 2 + (y - port_y) ** 2) ** 0.5
-            if distance <= port_click_radius:
-                return i
-
-        return None
+        return node.input_port_at(x, y, self._PORT_R2)
 
     def _get_connection_at_point(self, x, y):
         """
@@ -328,14 +499,18 @@ class AssetsCanvas(Gtk.DrawingArea):
         """
         click_tolerance = 8  # Pixels de tolerância para clicar na linha
 
-        for connection in self.connections:
-            source_node, out_port, target_node, in_port = connection
-
-            # Pegar posições das portas
-            start = source_node.get_output_port_position(out_port)
-            end = target_node.get_input_port_position(in_port)
-
-            if not start or not end:
+        connections = self.connections
+        for connection, geometry in connections.items():
+            if geometry is None:
+                geometry = self._connection_geometry(connection)
+            if not geometry:
+                continue  # Porta inexistente - conexão não é desenhada
+
+            # Rejeição rápida pela caixa da curva (extremidades + controles,
+            # expandida pela tolerância) antes de amostrar a Bezier
+            start, end, xmin, ymin, xmax, ymax = geometry
+            if (x < xmin - click_tolerance or x > xmax + click_tolerance or
+                    y < ymin - click_tolerance or y > ymax + click_tolerance):
                 continue
 
             # Verificar se o ponto está próximo da linha (usando curva Bezier simplificada)
@@ -344,10 +519,51 @@ class AssetsCanvas(Gtk.DrawingArea):
 
         return None
 
+    def _connection_geometry(self, connection):
+        """
+        Calcula (e guarda em self.connections) a geometria de uma conexão:
+        posições das portas e a caixa da curva Bezier. Invalidada por
+        _index_node quando um dos nós se move ou muda de tamanho.
+
+        Args:
+            connection: Tupla (source_node, out_port, target_node, in_port)
+
+        Returns:
+            tuple: (start, end, xmin, ymin, xmax, ymax), ou () se alguma
+                   porta não existir
+        """
+        source_node, out_port, target_node, in_port = connection
+        start = source_node.get_output_port_position(out_port)
+        end = target_node.get_input_port_position(in_port)
+
+        if not start or not end:
+            geometry = ()
+        else:
+            # y da curva fica entre y1 e y2 (controles têm o y das pontas);
+            # em x, os controles estendem a caixa (mesma lógica do _draw_connection)
+            x1, y1 = start
+            x2, y2 = end
+            offset = min(abs(x2 - x1) * 0.5, 100)
+            geometry = (
+                start, end,
+                min(x1, x2 - offset), min(y1, y2),
+                max(x2, x1 + offset), max(y1, y2),
+            )
+
+        self.connections[connection] = geometry
+        return geometry
+
+    def _invalidate_connection_geometry(self, node):
+        """Marca para recálculo a geometria das conexões ligadas ao nó"""
+        connections = self.connections
+        for adjacency in (self._outgoing, self._incoming):
+            for connection in adjacency.get(node, ()):
+                connections[connection] = None
+
     def _point_near_bezier(self, px, py, start, end, tolerance):
         """
         Verifica se um ponto está próximo a uma curva Bezier.
-        Usa aproximação por segmentos de linha.
+        Usa aproximação por segmentos de linha, avaliados todos juntos com NumPy.
 
         Args:
             px, py: Ponto a testar
@@ -361,328 +577,453 @@ class AssetsCanvas(Gtk.DrawingArea):
         x1, y1 = start
         x2, y2 = end
 
-        # Calcular pontos de controle (mesma lógica do _draw_connection)
-        distance = abs(x2 - x1)
-        offset = min(distance * 0.5, 100)
+        # Pontos de controle (mesma lógica do _draw_connection): ctrl1_y == y1
+        # e ctrl2_y == y2, então y só depende das extremidades
+        offset = min(abs(x2 - x1) * 0.5, 100)
         ctrl1_x = x1 + offset
-        ctrl1_y = y1
         ctrl2_x = x2 - offset
-        ctrl2_y = y2
 
-        # Aproximar curva Bezier com segmentos de linha
-        num_samples = 20
-        for i in range(num_samples):
-            t = i / num_samples
-            t_next = (i + 1) / num_samples
+        # Todos os pontos amostrados da curva de uma vez (base de Bernstein)
+        bx = _BEZ_B0 * x1 + _BEZ_B1 * ctrl1_x + _BEZ_B2 * ctrl2_x + _BEZ_B3 * x2
+        by = (_BEZ_B0 + _BEZ_B1) * y1 + (_BEZ_B2 + _BEZ_B3) * y2
 
-            # Ponto atual na curva
-            bx = (1-t)**3 * x1 + 3*(1-t)**2*t * ctrl1_x + 3*(1-t)*t**2 * ctrl2_x + t**3 * x2
-            by = (1-t)**3 * y1 + 3*(1-t)**2*t * ctrl1_y + 3*(1-t)*t**2 * ctrl2_y + t**3 * y2
+        # Distância (ao quadrado) do ponto a cada segmento consecutivo
+        sx, sy = bx[:-1], by[:-1]
+        dx, dy = bx[1:] - sx, by[1:] - sy
+        len2 = dx * dx + dy * dy
+        dot = (px - sx) * dx + (py - sy) * dy
+        t = np.clip(np.divide(dot, len2, out=np.zeros_like(len2), where=len2 > 0), 0.0, 1.0)
+        ex = px - (sx + t * dx)
+        ey = py - (sy + t * dy)
+        return bool((ex * ex + ey * ey <= tolerance * tolerance).any())
 
-            # Próximo ponto
-            bx_next = (1-t_next)**3 * x1 + 3*(1-t_next)**2*t_next * ctrl1_x + 3*(1-t_next)*t_next**2 * ctrl2_x + t_next**3 * x2
-            by_next = (1-t_next)**3 * y1 + 3*(1-t_next)**2*t_next * ctrl1_y + 3*(1-t_next)*t_next**2 * ctrl2_y + t_next**3 * y2
+    def _remove_connections_to_input_port(self, node, port_index):
+        """
+        Remove todas as conexões que chegam em uma porta de entrada específica (Opção C).
 
-            # Distância do ponto ao segmento de linha
-            dist = self._point_to_segment_distance(px, py, bx, by, bx_next, by_next)
-            if dist <= tolerance:
-                return True
+        Args:
+            node: Nó com a porta de entrada
+            port_index: Índice da porta de entrada
+        """
+        # Só olha as conexões que chegam no nó (O(grau), não O(conexões))
+        to_remove = [
+            conn for conn in self._incoming.get(node, ())
+            if conn[3] == port_index
+        ]
+        for conn in to_remove:
+            self._discard_connection(conn)
 
-        return False
+    def _add_connection(self, connection):
+        """
+        Adiciona uma conexão e atualiza a adjacência.
+
+        Args:
+            connection: Tupla (source_node, out_port, target_node, in_port)
+
+        Returns:
+            bool: True se adicionou, False se a conexão já existia
+        """
+        if connection in self.connections:
+            return False
 
-    def _point_to_segment_distance(self, px, py, x1, y1, x2, y2):
-        """Calcula distância de um ponto a um segmento de linha"""
-        # Vetor do segmento
-        dx = x2 - x1
-        dy = y2 - y1
+        self.connections[connection] = None
+        self._outgoing[connection[0]].add(connection)
+        self._incoming[connection[2]].add(connection)
+        self._graph_changed()
+        return True
 
-        if dx == 0 and dy == 0:
-            # Segmento é um ponto
-            return ((px - x1) ** 2 + (py - y1) ** 2) ** 0.5
+    def _discard_connection(self, connection):
+        """
+        Remove uma conexão (se existir) e atualiza a adjacência.
 
-        # Projeção do ponto no segmento (parametrizada entre 0 e 1)
-        t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)))
+        Args:
+            connection: Tupla (source_node, out_port, target_node, in_port)
+        """
+        if connection not in self.connections:
+            return
 
-        # Ponto mais próximo no segmento
-        closest_x = x1 + t * dx
-        closest_y = y1 + t * dy
+        del self.connections[connection]
+        self._graph_changed()
+        for adjacency, endpoint in ((self._outgoing, connection[0]),
+                                    (self._incoming, connection[2])):
+            node_conns = adjacency.get(endpoint)
+            if node_conns is not None:
+                node_conns.discard(connection)
 
-        # Distância
-        return ((px - closest_x) ** 2 + (py - closest_y) ** 2) ** 0.5
+        if connection == self.selected_connection:
+            self.selected_connection = None
 
-    def _remove_connections_to_input_port(self, node, port_index):
+    def set_connections(self, connections):
         """
-        Remove todas as conexões que chegam em uma porta de entrada específica (Opção C).
+        Substitui todas as conexões do canvas (ex: ao carregar ou limpar o grafo).
 
         Args:
-            node: Nó com a porta de entrada
-            port_index: Índice da porta de entrada
+            connections: Iterável de tuplas (source_node, out_port, target_node, in_port)
         """
-        # Filtrar conexões que NÃO vão para essa porta
-        before_count = len(self.connections)
-        self.connections = [
-            conn for conn in self.connections
-            if not (conn[2] == node and conn[3] == port_index)
-        ]
-        removed_count = before_count - len(self.connections)
+        self.connections = {}
+        self._outgoing = defaultdict(set)
+        self._incoming = defaultdict(set)
+        self._graph_changed()
+        self.selected_connection = None
+        for connection in connections:
+            self._add_connection(connection)
+
+    def _index_node(self, node):
+        """Atualiza a posição do nó nos índices espaciais (chamar após mover/redimensionar)"""
+        self._invalidate_connection_geometry(node)
+
+        self._node_bounds.set(
+            node,
+            node.x,
+            node.y,
+            node.x + node.WIDTH,
+            node.y + node.total_height
+        )
 
-        # if removed_count > 0:
-        #     print(f"✂️  Removidas {removed_count} conexão(ões) de {node.title}.in[{port_index}]")
-        # else:
-        #     print(f"⚠️  Nenhuma conexão em {node.title}.in[{port_index}]")
+        margin = self.PORT_CLICK_RADIUS  # Portas ficam na borda e são clicáveis fora dela
+        self._node_index.insert(
+            node,
+            node.x - margin,
+            node.y - margin,
+            node.x + node.WIDTH + margin,
+            node.y + node.total_height + margin
+        )
 
-    def bring_to_front(self, node):
+    def _raise_z(self, node):
+        """Dá ao nó o maior z-order (fica em cima nos hit-tests)"""
+        self._z_counter += 1
+        node.z = self._z_counter
+
+    def _nodes_at(self, x, y):
         """
-        Move um nó para o final da lista (z-order: fica em cima).
+        Retorna os nós candidatos a conter (x, y) - corpo ou portas.
 
         Args:
-            node: Nó a ser movido para frente
+            x, y: Ponto em coordenadas do canvas
+
+        Returns:
+            list: Nós perto do ponto, do mais em cima para o mais embaixo
         """
-        if node in self.nodes:
-            self.nodes.remove(node)
-            self.nodes.append(node)
-            # Atualizar índice de foco se necessário
-            if self.focused_node_index >= 0:
-                # O nó focado agora está no final da lista
-                self.focused_node_index = len(self.nodes) - 1
-            # print(f"  → Trouxe para frente: {node.title}")
+        return sorted(self._node_index.query_point(x, y),
+                      key=lambda node: node.z, reverse=True)
 
-    def on_key_pressed(self, controller, keyval, keycode, state):
+    def _node_at(self, x, y):
         """
-        Processa teclas pressionadas.
+        Retorna o nó mais em cima cujo corpo contém (x, y).
+        Uma passada pela célula do índice, sem ordenar os candidatos.
 
         Args:
-            controller: EventControllerKey
-            keyval: Valor da tecla (Gdk.KEY_*)
-            keycode: Código da tecla
-            state: Modificadores (Ctrl, Shift, etc)
+            x, y: Ponto em coordenadas do canvas
 
         Returns:
-            bool: True se processou a tecla (impede propagação)
+            Node ou None
         """
+        top = None
+        top_z = -1
+        for node in self._node_index.query_point(x, y):
+            z = node.z
+            if z > top_z and node.contains_point(x, y):
+                top = node
+                top_z = z
+        return top
+
+    def nodes_in_z_order(self):
+        """
+        Retorna self.nodes ordenada por z-order (de baixo para cima).
+        A ordenação é feita só se algum nó mudou de z desde a última vez.
 
-        # Verificar se Ctrl está pressionado
-        ctrl_pressed = state & Gdk.ModifierType.CONTROL_MASK
-
-        # Ctrl+C - Copiar nó focado
-        if ctrl_pressed and keyval == Gdk.KEY_c:
-            self._copy_focused_node()
-            return True
+        Returns:
+            list: A própria lista self.nodes, já ordenada
+        """
+        if self._nodes_order_dirty:
+            self.nodes.sort(key=lambda node: node.z)
+            self._node_pos = {node: i for i, node in enumerate(self.nodes)}
+            self._nodes_order_dirty = False
+        return self.nodes
 
-        # Ctrl+V - Colar nó do clipboard
-        if ctrl_pressed and keyval == Gdk.KEY_v:
-            self._paste_node()
-            return True
+    def add_node(self, node):
+        """
+        Adiciona um nó ao canvas (em cima dos demais).
 
-        # Ctrl+D - Duplicar nó focado
-        if ctrl_pressed and keyval == Gdk.KEY_d:
-            self._duplicate_focused_node()
-            return True
+        Args:
+            node: Nó a adicionar
+        """
+        self._node_pos[node] = len(self.nodes)
+        self.nodes.append(node)
+        self._graph_changed()
+        self._raise_z(node)
+        self._index_node(node)
 
-        # E - Editar código do nó focado
-        if keyval == Gdk.KEY_e and not ctrl_pressed:
-            if 0 <= self.focused_node_index < len(self.nodes):
-                self.context_menu_node = self.nodes[self.focused_node_index]
-                self.edit_node_code()
-                return True
-
-        # R - Renomear nó focado
-        if keyval == Gdk.KEY_r and not ctrl_pressed:
-            if 0 <= self.focused_node_index < len(self.nodes):
-                self.context_menu_node = self.nodes[self.focused_node_index]
-                self.rename_node()
-                return True
-
-        # P - Propriedades do nó focado
-        if keyval == Gdk.KEY_p and not ctrl_pressed:
-            if 0 <= self.focused_node_index < len(self.nodes):
-                self.context_menu_node = self.nodes[self.focused_node_index]
-                self.show_node_properties()
-                return True
-
-        # TAB - Próximo nó
-        if keyval == Gdk.KEY_Tab and not (state & Gdk.ModifierType.SHIFT_MASK):
-            self._focus_next_node()
-            return True
+    def set_nodes(self, nodes):
+        """
+        Substitui todos os nós do canvas (ex: ao carregar ou limpar o grafo).
+        Limpa seleção, foco e estados de interação que apontavam para nós antigos.
 
-        # Shift+TAB - Nó anterior
-        if keyval == Gdk.KEY_Tab and (state & Gdk.ModifierType.SHIFT_MASK):
-            self._focus_previous_node()
-            return True
+        Args:
+            nodes: Lista de nós (a ordem da lista é a ordem de desenho)
+        """
+        self.nodes = []
+        self._node_pos = {}
+        self._nodes_order_dirty = False
+        self._graph_changed()
+        self._node_index.clear()
+        self._node_bounds.clear()
+        for node in nodes:
+            self.add_node(node)
+
+        self.selected_node = None
+        self.focused_node = None
+        self.hovered_node = None
+        self.dragging_node = None
 
-        # Escape - Deselecionar tudo
-        if keyval == Gdk.KEY_Escape:
-            self._clear_selection()
-            return True
+    def _remove_node(self, node):
+        """
+        Remove um nó e todas as conexões ligadas a ele.
 
-        # Delete - Remover nó focado OU conexão selecionada
-        if keyval == Gdk.KEY_Delete:
-            # Prioridade: se tem conexão selecionada, remove ela
-            if self.selected_connection:
-                self._delete_selected_connection()
+        Args:
+            node: Nó a ser removido
+        """
+        # Remover conexões associadas ao nó (O(grau) via adjacência)
+        attached = self._outgoing.pop(node, set()) | self._incoming.pop(node, set())
+        for connection in attached:
+            self._discard_connection(connection)
+
+        # Foco passa para o próximo nó na ordem de z (ou o anterior, se era o último)
+        if node is self.focused_node:
+            nodes = self.nodes_in_z_order()
+            index = self._node_pos[node]
+            if index + 1 < len(nodes):
+                self.focused_node = nodes[index + 1]
+            elif index > 0:
+                self.focused_node = nodes[index - 1]
             else:
-                # Senão, remove nó focado
-                self._delete_focused_node()
-            return True
+                self.focused_node = None
+
+        # Remover o nó: a última posição da lista ocupa o buraco (O(1));
+        # a ordem de z é refeita sob demanda em nodes_in_z_order()
+        index = self._node_pos.pop(node)
+        last = self.nodes.pop()
+        self._graph_changed()
+        if last is not node:
+            self.nodes[index] = last
+            self._node_pos[last] = index
+            self._nodes_order_dirty = True
+        self._node_index.remove(node)
+        self._node_bounds.remove(node)
+        if node is self.selected_node:
+            self.selected_node = None
+        if node is self.hovered_node:
+            self.hovered_node = None
+        if node is self.dragging_node:
+            self.dragging_node = None
 
-        # Setas - Mover nó focado
-        if self.focused_node_index >= 0 and self.focused_node_index < len(self.nodes):
-            focused = self.nodes[self.focused_node_index]
-            move_speed = 10  # pixels por tecla
-
-            if keyval == Gdk.KEY_Left:
-                focused.move_to(focused.x - move_speed, focused.y)
-                self.queue_draw()
-                return True
-            elif keyval == Gdk.KEY_Right:
-                focused.move_to(focused.x + move_speed, focused.y)
-                self.queue_draw()
-                return True
-            elif keyval == Gdk.KEY_Up:
-                focused.move_to(focused.x, focused.y - move_speed)
-                self.queue_draw()
-                return True
-            elif keyval == Gdk.KEY_Down:
-                focused.move_to(focused.x, focused.y + move_speed)
-                self.queue_draw()
-                return True
-
-        return False  # Não processou - deixa propagar
+    def bring_to_front(self, node):
+        """
+        Coloca um nó em cima dos demais (maior z-order).
 
-    def _focus_next_node(self):
-        """Move foco para o próximo nó (TAB)"""
-        if not self.nodes:
-            return
+        Args:
+            node: Nó a ser movido para frente
+        """
+        # Só troca o z (O(1)); self.nodes é reordenada quando alguém precisar
+        if node in self._node_index and node.z != self._z_counter:
+            self._raise_z(node)
+            self._nodes_order_dirty = True
+
+    def on_key_pressed(self, controller, keyval, keycode, state):
+        """
+        Processa teclas pressionadas.
 
-        # Desselecionar atual
-        if 0 <= self.focused_node_index < len(self.nodes):
-            self.nodes[self.focused_node_index].set_selected(False)
+        Args:
+            controller: EventControllerKey
+            keyval: Valor da tecla (Gdk.KEY_*)
+            keycode: Código da tecla
+            state: Modificadores (Ctrl, Shift, etc)
 
-        # Próximo índice (circular)
-        self.focused_node_index = (self.focused_node_index + 1) % len(self.nodes)
+        Returns:
+            bool: True se processou a tecla (impede propagação)
+        """
 
-        # Selecionar novo
-        self.nodes[self.focused_node_index].set_selected(True)
-        # print(f"Foco → {self.nodes[self.focused_node_index].title}")
-        self.queue_draw()
+        # Um único AND com a máscara e uma busca O(1) na tabela
+        handler = self._key_handlers.get((keyval, int(state) & _MODS))
+        if handler is None:
+            return False  # Não processou - deixa propagar
+        return handler() is not False
+
+    def _focus_next_node(self):
+        """Move foco para o próximo nó (TAB)"""
+        self._move_focus(1)
 
     def _focus_previous_node(self):
         """Move foco para o nó anterior (Shift+TAB)"""
-        if not self.nodes:
-            return
+        self._move_focus(-1)
+
+    def _move_focus(self, step):
+        """
+        Move o foco `step` posições na ordem de z (circular).
+        Sem foco, TAB vai para o primeiro nó e Shift+TAB para o último.
 
-        # Desselecionar atual
-        if 0 <= self.focused_node_index < len(self.nodes):
-            self.nodes[self.focused_node_index].set_selected(False)
+        Args:
+            step: 1 para o próximo nó, -1 para o anterior
+        """
+        nodes = self.nodes_in_z_order()
+        if not nodes:
+            return
 
-        # Índice anterior (circular)
-        self.focused_node_index = (self.focused_node_index - 1) % len(self.nodes)
+        # A posição na lista só é procurada aqui (navegação por teclado)
+        if self.focused_node is None:
+            index = -1 if step > 0 else 0
+        else:
+            index = self._node_pos[self.focused_node]
+        self.focused_node = nodes[(index + step) % len(nodes)]
 
-        # Selecionar novo
-        self.nodes[self.focused_node_index].set_selected(True)
-        # print(f"Foco ← {self.nodes[self.focused_node_index].title}")
-        self.queue_draw()
+        # Selecionar novo (desmarca o atual)
+        self.select_node(self.focused_node)
+        self.request_redraw()
 
     def _clear_selection(self):
         """Deseleciona todos os nós (Escape)"""
-        for node in self.nodes:
-            node.set_selected(False)
-        self.focused_node_index = -1
-        # print("Seleção limpa")
-        self.queue_draw()
+        self.select_node(None)
+        self.focused_node = None
+        self.request_redraw()
+
+    def select_node(self, node):
+        """
+        Seleciona um único nó em O(1): só o nó selecionado antes é desmarcado.
+
+        Args:
+            node: Nó a selecionar, ou None para limpar a seleção
+        """
+        previous = self.selected_node
+        if previous is node:
+            return  # Já selecionado - nada muda
+        if previous is not None:
+            previous.set_selected(False)
+        if node is not None:
+            node.set_selected(True)
+        self.selected_node = node
 
     def _delete_focused_node(self):
         """Remove o nó que está com foco (Delete)"""
-        if 0 <= self.focused_node_index < len(self.nodes):
-            node_to_delete = self.nodes[self.focused_node_index]
+        if self.focused_node is not None:
+            node_to_delete = self.focused_node
 
-            # Remover conexões associadas ao nó
-            self.connections = [
-                conn for conn in self.connections
-                if conn[0] != node_to_delete and conn[2] != node_to_delete
-            ]
+            # Remover o nó e as conexões associadas a ele
+            self._remove_node(node_to_delete)
 
-            # Remover o nó
-            self.nodes.remove(node_to_delete)
-          #  print(f"✗ Removido: {node_to_delete.title}")
+            self.request_redraw()
 
-            # Ajustar índice de foco
-            if self.focused_node_index >= len(self.nodes):
-                self.focused_node_index = len(self.nodes) - 1
+    def _move_focused_node(self, dx, dy):
+        """
+        Move o nó focado (setas).
 
-            self.queue_draw()
+        Args:
+            dx, dy: Deslocamento em coordenadas do canvas
+
+        Returns:
+            bool: False se não há nó focado (tecla não processada)
+        """
+        focused = self.focused_node
+        if focused is None:
+            return False
+        focused.move_to(focused.x + dx, focused.y + dy)
+        self._index_node(focused)
+        self.request_redraw()
+        return True
+
+    def _open_focused_node_dialog(self, open_dialog):
+        """
+        Abre um dialog de nó (editar, renomear, propriedades) para o nó focado.
+
+        Args:
+            open_dialog: Método que abre o dialog para self.context_menu_node
+
+        Returns:
+            bool: False se não há nó focado (tecla não processada)
+        """
+        if self.focused_node is None:
+            return False
+        self.context_menu_node = self.focused_node
+        open_dialog()
+        return True
+
+    def _delete_selection(self):
+        """Remove a conexão selecionada ou, se não houver, o nó focado (Delete)"""
+        # Prioridade: se tem conexão selecionada, remove ela
+        if self.selected_connection:
+            self._delete_selected_connection()
+        else:
+            # Senão, remove nó focado
+            self._delete_focused_node()
 
     def _delete_selected_connection(self):
         """Remove a conexão selecionada (Delete - Opção A)"""
         if self.selected_connection and self.selected_connection in self.connections:
-            source_node, out_port, target_node, in_port = self.selected_connection
-            self.connections.remove(self.selected_connection)
-           # print(f"✂️  Conexão removida: {source_node.title}.out[{out_port}] → {target_node.title}.in[{in_port}]")
-            self.selected_connection = None
-            self.queue_draw()
+            self._discard_connection(self.selected_connection)
+            self.request_redraw()
 
     def _copy_focused_node(self):
         """Copia o nó focado para o clipboard (Ctrl+C)"""
-        if 0 <= self.focused_node_index < len(self.nodes):
-            self.clipboard_node = self.nodes[self.focused_node_index]
-            #print(f"📋 Copiado: {self.clipboard_node.title}")
-        #else:
-            #print("⚠️  Nenhum nó selecionado para copiar")
+        if self.focused_node is not None:
+            self.clipboard_node = self.focused_node.snapshot()
 
     def _paste_node(self):
         """Cola o nó do clipboard (Ctrl+V)"""
         if self.clipboard_node is None:
-            #print("⚠️  Clipboard vazio")
             return
 
         # Criar novo nó com offset de posição
+        # (lê do snapshot, não do nó original que pode ter se movido)
+        snapshot = self.clipboard_node
         offset = 30  # Deslocamento para não colar em cima
         new_node = Node(
-            self.clipboard_node.x + offset,
-            self.clipboard_node.y + offset,
-            f"{self.clipboard_node.title} (cópia)",
-            num_inputs=self.clipboard_node.num_inputs,
-            num_outputs=self.clipboard_node.num_outputs
+            snapshot.x + offset,
+            snapshot.y + offset,
+            f"{snapshot.title} (cópia)",
+            num_inputs=snapshot.num_inputs,
+            num_outputs=snapshot.num_outputs
         )
 
         # Adicionar à lista
-        self.nodes.append(new_node)
+        self.add_node(new_node)
 
         # NOTA: Não copiamos as conexões porque elas referenciam outros nós
         # Para copiar conexões seria necessário copiar também os nós conectados
 
-        # Desselecionar todos
-        for node in self.nodes:
-            node.set_selected(False)
-
-        # Selecionar o novo
-        new_node.set_selected(True)
+        # Selecionar o novo (desmarca o anterior)
+        self.select_node(new_node)
 
-        # Atualizar foco para o índice correto do novo nó
-        self.focused_node_index = self.nodes.index(new_node)
+        # Foco vai para o novo nó
+        self.focused_node = new_node
 
-        #print(f"📌 Colado: {new_node.title} em ({new_node.x:.0f}, {new_node.y:.0f})")
-        #print(f"   Foco atualizado para índice {self.focused_node_index}")
-        self.queue_draw()
+        self.request_redraw()
 
     def _duplicate_focused_node(self):
         """Duplica o nó focado (Ctrl+D) - atalho para copiar+colar"""
-        if 0 <= self.focused_node_index < len(self.nodes):
+        if self.focused_node is not None:
             # Copiar
             self._copy_focused_node()
             # Colar imediatamente
             self._paste_node()
-        #else:
-         #   print("⚠️  Nenhum nó selecionado para duplicar")
 
-    def execute_graph(self):
+    def execute_graph(self, plan):
         """
         Executa o grafo completo em ordem topológica com paralelização por níveis.
+        Roda numa thread de background: lê apenas o plano recebido (imutável),
+        nunca os dicts/sets do canvas, que a main thread pode alterar.
+
+        Args:
+            plan: (níveis, conexões de entrada por nó) de get_execution_plan,
+                  montado na main thread, ou None se o grafo tiver ciclos
 
         Returns:
             bool: True se execução foi bem sucedida, False caso contrário
         """
-        if not self.nodes:
+        if plan is None:
+            print("❌ Erro: Grafo contém ciclos! Não é possível executar.")
+            return False
+
+        levels, incoming = plan
+        if not levels:
             print("⚠️  Nenhum nó para executar")
             return False
 
@@ -692,26 +1033,18 @@ class AssetsCanvas(Gtk.DrawingArea):
         if hasattr(window, 'output_panel'):
             GLib.idle_add(window.output_panel.clear_all)
 
-        # 1. Verificar se grafo tem ciclos
-        execution_order = self._topological_sort()
-        if execution_order is None:
-            print("❌ Erro: Grafo contém ciclos! Não é possível executar.")
-            return False
-
-        # 2. Agrupar nós por nível de execução
-        levels = self._group_by_execution_level()
-
+        # 1-3. Ordem topológica, níveis e conexões de entrada vêm do plano
         print(f"📋 Níveis de execução: {len(levels)}")
         for i, level in enumerate(levels):
             print(f"  Nível {i}: {[node.title for node in level]}")
         print()
 
-        # 3. Dicionário para armazenar resultados de cada nó (thread-safe)
+        # 4. Dicionário para armazenar resultados de cada nó (thread-safe)
         import threading
         node_results = {}
         results_lock = threading.Lock()
 
-        # 4. Capturar stdout
+        # 5. Capturar stdout
         import sys
         from io import StringIO
 
@@ -719,7 +1052,7 @@ class AssetsCanvas(Gtk.DrawingArea):
         sys.stdout = captured_output = StringIO()
 
         try:
-            # 5. Executar cada nível em paralelo
+            # 6. Executar cada nível em paralelo
             for level_idx, level in enumerate(levels):
                 print(f"⚡ Executando nível {level_idx} ({len(level)} nós em paralelo)...",
                       file=sys.__stdout__)
@@ -729,7 +1062,7 @@ class AssetsCanvas(Gtk.DrawingArea):
                     try:
                         # Coletar inputs deste nó
                         with results_lock:
-                            inputs = self._collect_node_inputs(node, node_results)
+                            inputs = self._collect_node_inputs(node, node_results, incoming.get(node, ()))
 
                         # Executar código do nó
                         outputs = self._execute_node_code(node, inputs)
@@ -825,6 +1158,43 @@ class AssetsCanvas(Gtk.DrawingArea):
 
         # Output normal - não fazer nada (só passa para próximo nó)
 
+    def get_execution_plan(self):
+        """
+        Retorna o plano de execução do grafo, para passar a execute_graph.
+        Chamar na main thread: o plano é montado a partir dos dicts/sets do
+        canvas e entregue à thread de execução só com tuplas (imutáveis).
+        Calculado uma vez e reaproveitado entre execuções até o grafo mudar
+        (ver _graph_changed).
+
+        Returns:
+            tuple: (níveis, conexões de entrada por nó), ou None se o grafo
+                   tiver ciclos. Níveis é uma tupla de tuplas de nós, cada
+                   uma em z-order do momento em que o plano foi calculado
+                   (os nós de um nível rodam em paralelo; a ordem só afeta
+                   a submissão e o log); as conexões de cada nó seguem a
+                   ordem do grafo
+        """
+        if self._execution_plan is None:
+            execution_order = self._topological_sort()
+            if execution_order is None:
+                return None
+
+            levels = tuple(
+                tuple(level)
+                for level in self._group_by_execution_level(execution_order)
+                if level
+            )
+            incoming = defaultdict(list)
+            for connection in self.connections:
+                incoming[connection[2]].append(connection)
+            incoming = {node: tuple(conns) for node, conns in incoming.items()}
+            self._execution_plan = (levels, incoming)
+        return self._execution_plan
+
+    def _graph_changed(self):
+        """Descarta o plano de execução em cache (nó ou conexão criado/removido)"""
+        self._execution_plan = None
+
     def _topological_sort(self):
         """
         Ordena os nós em ordem topológica (dependências primeiro).
@@ -832,23 +1202,24 @@ class AssetsCanvas(Gtk.DrawingArea):
         Returns:
             list: Lista de nós em ordem de execução, ou None se houver ciclos
         """
-        # Construir grafo de dependências
-        in_degree = {node: 0 for node in self.nodes}
-        adjacency = {node: [] for node in self.nodes}
-
-        for source_node, out_port, target_node, in_port in self.connections:
-            adjacency[source_node].append(target_node)
-            in_degree[target_node] += 1
-
-        # Algoritmo de Kahn para ordenação topológica
-        queue = [node for node in self.nodes if in_degree[node] == 0]
+        # Grau de entrada direto da adjacência mantida pelo canvas.
+        # Percorre os nós em z-order: self.nodes perde essa ordem após
+        # bring_to_front/remoções e deixaria a ordem depender do histórico
+        nodes = self.nodes_in_z_order()
+        outgoing = self._outgoing
+        incoming = self._incoming
+        in_degree = {node: len(incoming.get(node, ())) for node in nodes}
+
+        # Algoritmo de Kahn para ordenação topológica (deque: popleft em O(1))
+        queue = deque(node for node in nodes if in_degree[node] == 0)
         result = []
 
         while queue:
-            node = queue.pop(0)
+            node = queue.popleft()
             result.append(node)
 
-            for neighbor in adjacency[node]:
+            for connection in outgoing.get(node, ()):
+                neighbor = connection[2]
                 in_degree[neighbor] -= 1
                 if in_degree[neighbor] == 0:
                     queue.append(neighbor)
@@ -859,44 +1230,40 @@ class AssetsCanvas(Gtk.DrawingArea):
 
         return result
 
-    def _group_by_execution_level(self):
+    def _group_by_execution_level(self, execution_order):
         """
         Agrupa nós por nível de execução (profundidade no DAG).
         Nós no mesmo nível podem ser executados em paralelo.
 
+        Args:
+            execution_order: Nós em ordem topológica (de _topological_sort)
+
         Returns:
             list[list[Node]]: Lista de níveis, cada nível contém lista de nós
+                              (dentro do nível, em z-order, de baixo para cima)
         """
-        # Calcular profundidade de cada nó (distância máxima da raiz)
-        depth = {node: 0 for node in self.nodes}
-
-        # Construir adjacências inversas (target -> sources)
-        predecessors = {node: [] for node in self.nodes}
-        for source_node, out_port, target_node, in_port in self.connections:
-            predecessors[target_node].append(source_node)
-
-        # Calcular profundidade de cada nó
-        changed = True
-        while changed:
-            changed = False
-            for node in self.nodes:
-                if predecessors[node]:
-                    max_pred_depth = max(depth[pred] for pred in predecessors[node])
-                    new_depth = max_pred_depth + 1
-                    if new_depth > depth[node]:
-                        depth[node] = new_depth
-                        changed = True
+        # Profundidade de cada nó (distância máxima da raiz): em ordem
+        # topológica os predecessores já foram calculados - uma passada só
+        incoming = self._incoming
+        depth = {}
+        for node in execution_order:
+            node_depth = 0
+            for connection in incoming.get(node, ()):
+                pred_depth = depth[connection[0]] + 1
+                if pred_depth > node_depth:
+                    node_depth = pred_depth
+            depth[node] = node_depth
 
         # Agrupar por profundidade
         max_depth = max(depth.values()) if depth else 0
         levels = [[] for _ in range(max_depth + 1)]
 
-        for node in self.nodes:
+        for node in self.nodes_in_z_order():
             levels[depth[node]].append(node)
 
         return levels
 
-    def _collect_node_inputs(self, node, node_results):
+    def _collect_node_inputs(self, node, node_results, incoming):
         """
         Coleta os inputs de um nó a partir dos resultados dos nós anteriores.
 
@@ -905,6 +1272,7 @@ class AssetsCanvas(Gtk.DrawingArea):
         Args:
             node: Nó cujos inputs serão coletados
             node_results: Dicionário com resultados dos nós já executados
+            incoming: Conexões que chegam neste nó (na ordem do grafo)
 
         Returns:
             tuple: Tupla com os inputs do nó
@@ -915,15 +1283,13 @@ class AssetsCanvas(Gtk.DrawingArea):
         # Rastrear múltiplas conexões por porta
         connections_per_port = [[] for _ in range(node.num_inputs)]
 
-        # Coletar TODAS as conexões para cada porta
-        for source_node, out_port, target_node, in_port in self.connections:
-            if target_node == node:
-                # Esta conexão fornece input para este nó
-                if source_node in node_results:
-                    source_outputs = node_results[source_node]
-                    if out_port < len(source_outputs):
-                        # Adicionar à lista de conexões desta porta
-                        connections_per_port[in_port].append(source_outputs[out_port])
+        # Coletar TODAS as conexões para cada porta (só as que chegam no nó)
+        for source_node, out_port, target_node, in_port in incoming:
+            if source_node in node_results:
+                source_outputs = node_results[source_node]
+                if out_port < len(source_outputs):
+                    # Adicionar à lista de conexões desta porta
+                    connections_per_port[in_port].append(source_outputs[out_port])
 
         # Processar cada porta de entrada
         for port_idx in range(node.num_inputs):
@@ -963,17 +1329,8 @@ class AssetsCanvas(Gtk.DrawingArea):
             return result
 
         # Cache miss - executar código
-        # Transformar o código em uma função
-        # O código já está escrito como corpo de função (com return)
-        code_as_function = "def __node_function(inputs):\n"
-        for line in node.code.split('\n'):
-            code_as_function += f"    {line}\n"
-
-        namespace = {'__builtins__': __builtins__}
-        exec(code_as_function, namespace)
-
-        # Chamar a função com os inputs
-        result = namespace['__node_function'](inputs)
+        # (a função é compilada uma vez por código, ver Node.get_function)
+        result = node.get_function()(inputs)
 
         # Garantir que retorno é tupla
         if not isinstance(result, tuple):
@@ -994,19 +1351,21 @@ class AssetsCanvas(Gtk.DrawingArea):
             self.creating_connection = False
             self.connection_start_node = None
             self.connection_start_port = None
-            self.queue_draw()
+            self.request_redraw()
             return
 
         # Se estava fazendo pan
         if self.panning:
             self.panning = False
+            self.request_redraw()  # Refazer o último frame em qualidade normal
             return
 
         # Se estava arrastando nó
+        self._apply_pending_drag()  # Posição final antes de soltar o nó
         if self.dragging_node:
             self.dragging_node.stop_drag()
             self.dragging_node = None
-            # print("  → Parou de arrastar")
+            self.request_redraw()
 
     def _finish_connection(self, x, y):
         """
@@ -1016,7 +1375,7 @@ class AssetsCanvas(Gtk.DrawingArea):
             x, y: Posição onde soltou o mouse
         """
         # Verificar se soltou em uma porta de ENTRADA
-        for node in reversed(self.nodes):
+        for node in self._nodes_at(x, y):
             port_index = self._get_input_port_at(node, x, y)
             if port_index is not None:
                 # Soltou em uma porta de entrada válida!
@@ -1028,17 +1387,10 @@ class AssetsCanvas(Gtk.DrawingArea):
                     port_index
                 )
 
-                # Verificar se já existe essa conexão
-                if new_connection not in self.connections:
-                    self.connections.append(new_connection)
-                    # print(f"✅ Conexão criada: {self.connection_start_node.title}.out[{self.connection_start_port}] → {node.title}.in[{port_index}]")
-                # else:
-                    # print(f"⚠️  Conexão já existe")
-
-                # return
+                # Adicionar (ignorada se essa conexão já existe)
+                self._add_connection(new_connection)
 
-        # Se chegou aqui, não soltou em uma porta válida
-        # print(f"❌ Conexão cancelada (não soltou em porta de entrada)")
+                return  # Só a porta do nó mais em cima
 
     def on_drag_begin(self, gesture, start_x, start_y):
         """Quando começa a arrastar"""
@@ -1049,12 +1401,10 @@ class AssetsCanvas(Gtk.DrawingArea):
             return
 
         # Verificar se começou a arrastar sobre um nó
-        for node in reversed(self.nodes):
-            if node.contains_point(canvas_x, canvas_y):
-                self.dragging_node = node
-                self.dragging_node.start_drag(canvas_x, canvas_y)
-            #    print(f"Começou a arrastar: {node.title}")
-                break
+        node = self._node_at(canvas_x, canvas_y)
+        if node is not None:
+            self.dragging_node = node
+            self.dragging_node.start_drag(canvas_x, canvas_y)
 
     def on_drag_update(self, gesture, offset_x, offset_y):
         """Enquanto arrasta"""
@@ -1067,55 +1417,236 @@ class AssetsCanvas(Gtk.DrawingArea):
             self.pan_offset_y = (start_y + offset_y) - self.pan_start_y + self.pan_offset_y
             self.pan_start_x = start_x + offset_x
             self.pan_start_y = start_y + offset_y
-            self.queue_draw()
+            self.request_redraw()
             return
 
-        # Se está arrastando um nó
+        # Se está arrastando um nó (aplicado no próximo frame, ver _on_input_tick)
         if self.dragging_node:
-            # Calcular posição atual
-            current_x = start_x + offset_x
-            current_y = start_y + offset_y
-            canvas_x, canvas_y = self._screen_to_canvas(current_x, current_y)
-            # Atualizar posição do nó
-            self.dragging_node.update_drag(canvas_x, canvas_y)
+            self._pending_drag = (start_x + offset_x, start_y + offset_y)
+            self._schedule_input_tick()
+
+    def _apply_pending_drag(self):
+        """Move o nó arrastado para a última posição recebida (se houver)"""
+        pending = self._pending_drag
+        self._pending_drag = None
+        if pending is None or not self.dragging_node:
+            return
+
+        canvas_x, canvas_y = self._screen_to_canvas(*pending)
+        self.dragging_node.update_drag(canvas_x, canvas_y)
+        self._index_node(self.dragging_node)
+        self.request_redraw()
+
+    def _schedule_input_tick(self):
+        """Agenda o processamento do movimento pendente para o próximo frame"""
+        if self._input_tick_id is None:
+            self._input_tick_id = self.add_tick_callback(self._on_input_tick)
+
+    def _on_input_tick(self, widget, frame_clock):
+        """
+        Tick do frame clock: processa só o último arraste/movimento recebido
+        desde o frame anterior (eventos intermediários são descartados).
+        """
+        self._input_tick_id = None
+        self._apply_pending_drag()
+
+        pending = self._pending_motion
+        self._pending_motion = None
+        if pending is not None:
+            self._handle_mouse_motion(*pending)
+
+        # Redesenho pedido aqui já entra neste frame (sem esperar outro tick)
+        if self._redraw_tick_id is not None:
+            self.remove_tick_callback(self._redraw_tick_id)
+            self._redraw_tick_id = None
             self.queue_draw()
+        return GLib.SOURCE_REMOVE
 
     def on_drag_end(self, gesture, offset_x, offset_y):
         """Quando termina de arrastar"""
+        self._apply_pending_drag()  # Posição final antes de soltar o nó
         if self.dragging_node:
             self.dragging_node.stop_drag()
-            #print(f"  → Nova posição: ({self.dragging_node.x:.0f}, {self.dragging_node.y:.0f})")
             self.dragging_node = None
+            self.request_redraw()  # Refazer o último frame em qualidade normal
 
     def on_mouse_motion(self, controller, x, y):
-        """Quando o mouse se move (para hover)"""
+        """Quando o mouse se move: guarda a posição e processa uma vez por frame"""
+        self._pointer_pos = (x, y)
+        self._pending_motion = (x, y)
+        self._schedule_input_tick()
+
+    def _handle_mouse_motion(self, x, y):
+        """Processa o movimento do mouse (hover e linha da conexão em criação)"""
         canvas_x, canvas_y = self._screen_to_canvas(x, y)
 
         # Se está criando conexão, atualizar posição do mouse
         if self.creating_connection:
             self.connection_mouse_pos = (canvas_x, canvas_y)
-            self.queue_draw()
+            self.request_redraw()
+            return
+
+        # Caminho rápido: ainda dentro do nó que já está em hover e nenhum
+        # outro nó pode estar por cima dele nesse ponto (é o nó mais em cima
+        # ou está sozinho na célula do índice)
+        hovered = self.hovered_node
+        if (hovered is not None and hovered.contains_point(canvas_x, canvas_y) and
+                (hovered.z == self._z_counter or
+                 len(self._node_index.query_point(canvas_x, canvas_y)) == 1)):
             return
 
         # Verificar se está sobre algum nó
-        found_hover = False
-        for node in reversed(self.nodes):
-            if node.contains_point(canvas_x, canvas_y):
-                if node != self.hovered_node:
-                    # Entrou em um novo nó
-                    if self.hovered_node:
-                        self.hovered_node.set_hovered(False)
-                    node.set_hovered(True)
-                    self.hovered_node = node
-                    self.queue_draw()
-                found_hover = True
-                break
+        node = self._node_at(canvas_x, canvas_y)
+        if node is not None:
+            if node != self.hovered_node:
+                # Entrou em um novo nó
+                if self.hovered_node:
+                    self.hovered_node.set_hovered(False)
+                node.set_hovered(True)
+                self.hovered_node = node
+                self.request_redraw()
 
         # Se não está sobre nenhum nó, limpar hover
-        if not found_hover and self.hovered_node:
+        elif self.hovered_node:
             self.hovered_node.set_hovered(False)
             self.hovered_node = None
-            self.queue_draw()
+            self.request_redraw()
+
+    def request_redraw(self):
+        """
+        Pede um redesenho do canvas no próximo frame.
+        Pedidos repetidos antes do frame são agrupados em um único queue_draw.
+        """
+        if self._redraw_tick_id is None:
+            self._redraw_tick_id = self.add_tick_callback(self._on_redraw_tick)
+
+    def _on_redraw_tick(self, widget, frame_clock):
+        """Tick do frame clock: faz o queue_draw pendente e se desregistra"""
+        self._redraw_tick_id = None
+        self.queue_draw()
+        return GLib.SOURCE_REMOVE
+
+    def _get_grid_pattern(self):
+        """
+        Retorna o padrão do grid de fundo para o zoom atual.
+        Uma única célula do grid é desenhada numa ImageSurface (na resolução
+        real da tela, incluindo o fator de escala HiDPI, para a linha
+        continuar com 1px nítido) e repetida pelo Cairo.
+        Só é recriado quando o zoom ou o fator de escala mudam.
+
+        Returns:
+            cairo.SurfacePattern: Padrão em coordenadas do canvas
+        """
+        scale = self.get_scale_factor()
+        key = (self.zoom_level, scale)
+        if self._grid_pattern_key == key:
+            return self._grid_pattern
+
+        grid_size = self.GRID_SIZE
+        # Célula em pixels do dispositivo; arredondar para baixo garante que
+        # cada pixel da célula cubra ao menos um pixel da tela (a linha nunca some)
+        tile_px = max(1, int(grid_size * self.zoom_level * scale))
+
+        tile = cairo.ImageSurface(cairo.FORMAT_ARGB32, tile_px, tile_px)
+        tile_context = cairo.Context(tile)
+        tile_context.set_source_rgb(*self.GRID_COLOR)
+        tile_context.rectangle(0, 0, tile_px, 1)  # Linha horizontal
+        tile_context.rectangle(0, 0, 1, tile_px)  # Linha vertical
+        tile_context.fill()
+
+        pattern = cairo.SurfacePattern(tile)
+        pattern.set_extend(cairo.EXTEND_REPEAT)
+        pattern.set_filter(cairo.FILTER_NEAREST)  # Sem borrar a linha
+        # Matriz do padrão: canvas -> pixels da célula (grid_size unidades = tile_px)
+        # A imagem não tem device scale: 1 pixel da célula = 1 pixel do dispositivo
+        scale = tile_px / grid_size
+        pattern.set_matrix(cairo.Matrix(xx=scale, yy=scale))
+
+        self._grid_pattern = pattern
+        self._grid_pattern_key = key
+        return pattern
+
+    def _get_info_surface(self):
+        """
+        Retorna a imagem com o texto de info (zoom/pan).
+        O texto só é formatado e rasterizado de novo quando o zoom ou o
+        pan (arredondados como aparecem no texto) mudam.
+
+        Returns:
+            cairo.ImageSurface: Texto com a linha de base a 10px do topo
+        """
+        scale = self.get_scale_factor()
+        key = (round(self.zoom_level * 100), round(self.pan_offset_x),
+               round(self.pan_offset_y), scale)
+        if key == self._info_key:
+            return self._info_surface
+
+        zoom_percent, pan_x, pan_y, _ = key
+        info_text = f"Zoom: {zoom_percent}% | Pan: ({pan_x}, {pan_y}) | Scroll para zoom, Arraste vazio para pan"
+
+        # Medir o texto num contexto descartável para dimensionar a imagem
+        measure = cairo.Context(cairo.ImageSurface(cairo.FORMAT_ARGB32, 1, 1))
+        measure.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+        measure.set_font_size(11)
+        text_width = measure.text_extents(info_text).x_advance + 2 * self.INFO_PADDING
+
+        # Imagem na resolução real da tela (HiDPI)
+        surface = cairo.ImageSurface(
+            cairo.FORMAT_ARGB32, int(text_width * scale) + 1, 20 * scale
+        )
+        surface.set_device_scale(scale, scale)
+        text_context = cairo.Context(surface)
+        text_context.set_source_rgb(0.3, 0.3, 0.3)
+        text_context.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+        text_context.set_font_size(11)
+        text_context.move_to(self.INFO_PADDING, 10)
+        text_context.show_text(info_text)
+
+        self._info_surface = surface
+        self._info_key = key
+        return surface
+
+    def _get_grid_path(self, width, height):
+        """
+        Retorna o path das linhas do grid visíveis (zoom > 1).
+        As linhas são montadas uma vez e o path é reaproveitado enquanto
+        zoom e intervalo visível do grid não mudarem.
+
+        Args:
+            width, height: Tamanho do widget em pixels
+
+        Returns:
+            cairo.Path: Linhas em coordenadas do canvas
+        """
+        # Mesma vista do frame anterior: nem recalcula o intervalo
+        view_key = (self.pan_offset_x, self.pan_offset_y, self.zoom_level, width, height)
+        if view_key == self._grid_view_key:
+            return self._grid_path
+        self._grid_view_key = view_key
+
+        grid_size = self.GRID_SIZE
+        inv_zoom = self._inv_zoom
+        start_x = int(-self.pan_offset_x * inv_zoom // grid_size) * grid_size
+        start_y = int(-self.pan_offset_y * inv_zoom // grid_size) * grid_size
+        end_x = int((width - self.pan_offset_x) * inv_zoom) + grid_size
+        end_y = int((height - self.pan_offset_y) * inv_zoom) + grid_size
+
+        key = (start_x, start_y, end_x, end_y)
+        if key == self._grid_path_key:
+            return self._grid_path
+
+        # Contexto descartável só para montar o path
+        path_context = cairo.Context(cairo.RecordingSurface(cairo.CONTENT_ALPHA, None))
+        for x in range(start_x, end_x, grid_size):
+            path_context.move_to(x, start_y)
+            path_context.line_to(x, end_y)
+        for y in range(start_y, end_y, grid_size):
+            path_context.move_to(start_x, y)
+            path_context.line_to(end_x, y)
+
+        self._grid_path = path_context.copy_path()
+        self._grid_path_key = key
+        return self._grid_path
 
     def on_draw(self, area, context, width, height):
         """Desenha o canvas e todos os nós"""
@@ -1126,69 +1657,75 @@ class AssetsCanvas(Gtk.DrawingArea):
         # Salvar estado do contexto
         context.save()
 
+        # Durante pan/arraste/criação de conexão, antialias rápido: o frame
+        # some no próximo evento; ao soltar, o canvas é redesenhado normal
+        if self.panning or self.dragging_node is not None or self.creating_connection:
+            context.set_antialias(cairo.ANTIALIAS_FAST)
+
         # Aplicar transformações de pan e zoom
         context.translate(self.pan_offset_x, self.pan_offset_y)
         context.scale(self.zoom_level, self.zoom_level)
 
-        # Grid de fundo sutil (ajustado para zoom)
-        context.set_source_rgb(0.96, 0.96, 0.96)
-        context.set_line_width(1 / self.zoom_level)  # Linha sempre fina
-
-        grid_size = 20
-        # Calcular limites visíveis do grid
-        start_x = int(-self.pan_offset_x / self.zoom_level / grid_size) * grid_size
-        start_y = int(-self.pan_offset_y / self.zoom_level / grid_size) * grid_size
-        end_x = int((width - self.pan_offset_x) / self.zoom_level) + grid_size
-        end_y = int((height - self.pan_offset_y) / self.zoom_level) + grid_size
-
-        for x in range(start_x, end_x, grid_size):
-            context.move_to(x, start_y)
-            context.line_to(x, end_y)
-        for y in range(start_y, end_y, grid_size):
-            context.move_to(start_x, y)
-            context.line_to(end_x, y)
-        context.stroke()
-
-        # Desenhar todos os nós
-        for node in self.nodes:
+        # Grid de fundo sutil (pintado só na área exposta)
+        if self.zoom_level <= 1.0:
+            # Padrão repetido: muitas linhas na tela, uma única pintura
+            context.set_source(self._get_grid_pattern())
+            context.paint()
+        else:
+            # Zoom alto: poucas linhas, path em cache com linha exata de 1px
+            context.set_source_rgb(*self.GRID_COLOR)
+            context.set_line_width(self._inv_zoom)
+            context.append_path(self._get_grid_path(width, height))
+            context.stroke()
+
+        # Desenhar só os nós que tocam a área exposta (em coordenadas do canvas)
+        # (teste vetorizado sobre todos os retângulos; margem cobre portas e brilho)
+        clip_x0, clip_y0, clip_x1, clip_y1 = context.clip_extents()
+        margin = Node.DRAW_MARGIN
+        visible = self._node_bounds.query_rect(
+            clip_x0 - margin, clip_y0 - margin, clip_x1 + margin, clip_y1 + margin
+        )
+        visible.sort(key=lambda node: node.z)  # De baixo para cima
+        for node in visible:
             node.draw(context)
 
-        # Desenhar conexões
-        self._draw_example_connections(context)
+        # Desenhar conexões (também só as que tocam a área exposta)
+        self._draw_example_connections(context, (clip_x0, clip_y0, clip_x1, clip_y1))
 
         # Restaurar estado do contexto
         context.restore()
 
         # Desenhar info de zoom/pan (fora da transformação)
-        context.set_source_rgb(0.3, 0.3, 0.3)
-        context.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
-        context.set_font_size(11)
-        info_text = f"Zoom: {self.zoom_level * 100:.0f}% | Pan: ({self.pan_offset_x:.0f}, {self.pan_offset_y:.0f}) | Scroll para zoom, Arraste vazio para pan"
-        context.move_to(10, height - 10)
-        context.show_text(info_text)
-
-    def _draw_example_connections(self, context):
-        """Desenha todas as conexões armazenadas"""
-
-        # Desenhar cada conexão da lista
-        for connection in self.connections:
-            source_node, out_port, target_node, in_port = connection
-
-            # Pegar posições das portas
-            start = source_node.get_output_port_position(out_port)
-            end = target_node.get_input_port_position(in_port)
-
-            # Desenhar se ambas as portas existem
-            if start and end:
-                # Cor diferente se está selecionada
-                if connection == self.selected_connection:
-                    context.set_line_width(4)
-                    context.set_source_rgba(1.0, 0.3, 0.3, 0.9)  # Vermelho para selecionada
-                else:
-                    context.set_line_width(3)
-                    context.set_source_rgba(0.3, 0.6, 0.9, 0.8)  # Azul normal
+        context.set_source_surface(self._get_info_surface(), 10 - self.INFO_PADDING, height - 20)
+        context.paint()
 
-                self._draw_connection(context, start, end)
+    def _draw_example_connections(self, context, visible_rect=None):
+        """
+        Desenha todas as conexões armazenadas, a partir da geometria em
+        cache (_connection_geometry).
+
+        Args:
+            context: Cairo context
+            visible_rect: (x0, y0, x1, y1) em coordenadas do canvas; conexões
+                totalmente fora dele são puladas (None = desenhar todas)
+        """
+        if visible_rect is not None:
+            # Margem para a largura da linha
+            pad = self.CONNECTION_STYLE_SELECTED[0]
+            visible_rect = (visible_rect[0] - pad, visible_rect[1] - pad,
+                            visible_rect[2] + pad, visible_rect[3] + pad)
+
+        # Normal primeiro, selecionada por cima
+        selected = self.selected_connection
+        self._stroke_connections(
+            context,
+            (connection for connection in self.connections if connection != selected),
+            self.CONNECTION_STYLE_NORMAL, visible_rect
+        )
+        if selected is not None and selected in self.connections:
+            self._stroke_connections(
+                context, (selected,), self.CONNECTION_STYLE_SELECTED, visible_rect
+            )
 
         # Se está criando uma conexão, desenhar linha temporária
         if self.creating_connection and self.connection_start_node:
@@ -1198,10 +1735,54 @@ class AssetsCanvas(Gtk.DrawingArea):
                 context.set_line_width(3)
                 context.set_source_rgba(0.3, 0.8, 0.3, 0.7)  # Verde semi-transparente
                 self._draw_connection(context, start, self.connection_mouse_pos)
+                context.stroke()
+
+    def _stroke_connections(self, context, connections, style, visible_rect=None):
+        """
+        Desenha um grupo de conexões num único path, com um único stroke.
+
+        Args:
+            context: Cairo context
+            connections: Conexões a desenhar
+            style: (largura da linha, rgba)
+            visible_rect: (x0, y0, x1, y1) já com margem; conexões cuja caixa
+                fica totalmente fora dele são puladas (None = desenhar todas)
+        """
+        move_to = context.move_to
+        curve_to = context.curve_to
+        geometries = self.connections
+        if visible_rect is not None:
+            vx0, vy0, vx1, vy1 = visible_rect
+        has_path = False
+        for connection in connections:
+            geometry = geometries[connection]
+            if geometry is None:
+                geometry = self._connection_geometry(connection)
+            if not geometry:
+                continue  # Porta inexistente
+            if visible_rect is not None and (
+                    geometry[4] < vx0 or geometry[2] > vx1 or
+                    geometry[5] < vy0 or geometry[3] > vy1):
+                continue
+
+            # Mesma curva de _draw_connection, inline para evitar uma
+            # chamada de método por conexão
+            (x1, y1), (x2, y2) = geometry[0], geometry[1]
+            offset = min(abs(x2 - x1) * 0.5, 100)
+            move_to(x1, y1)
+            curve_to(x1 + offset, y1, x2 - offset, y2, x2, y2)
+            has_path = True
+
+        if has_path:
+            line_width, rgba = style
+            context.set_line_width(line_width)
+            context.set_source_rgba(*rgba)
+            context.stroke()
 
     def _draw_connection(self, context, start, end):
         """
-        Desenha uma conexão curva (Bezier) entre duas portas
+        Adiciona ao path atual uma conexão curva (Bezier) entre duas portas.
+        Não faz stroke: o chamador define o estilo e faz stroke do grupo.
 
         Args:
             context: Cairo context
@@ -1221,10 +1802,9 @@ class AssetsCanvas(Gtk.DrawingArea):
         ctrl2_x = x2 - offset
         ctrl2_y = y2
 
-        # Desenhar curva
+        # Adicionar curva ao path
         context.move_to(x1, y1)
         context.curve_to(ctrl1_x, ctrl1_y, ctrl2_x, ctrl2_y, x2, y2)
-        context.stroke()
 
     def _show_node_context_menu(self, node, x, y):
         """
@@ -1234,8 +1814,6 @@ class AssetsCanvas(Gtk.DrawingArea):
             node: Nó clicado
             x, y: Posição do clique (coordenadas da tela/widget)
         """
-        print(f"📝 Criando menu de contexto para: {node.title}")
-
         menu = Gio.Menu()
 
         # Opções do menu
@@ -1245,8 +1823,6 @@ class AssetsCanvas(Gtk.DrawingArea):
         menu.append("Save to Library", "canvas.save-to-library")
         menu.append("Delete", "canvas.delete")
 
-        print(f"✓ Menu criado com 4 itens")
-
         # Criar popover
         popover = Gtk.PopoverMenu()
         popover.set_menu_model(menu)
@@ -1264,11 +1840,8 @@ class AssetsCanvas(Gtk.DrawingArea):
         # Guardar nó atual para as actions
         self.context_menu_node = node
 
-        print(f"✓ Popover configurado em ({x:.0f}, {y:.0f})")
-
         # Mostrar menu
         popover.popup()
-        print(f"✓ popup() chamado")
 
     def edit_node_code(self):
         """Abre dialog para editar código do nó"""
@@ -1287,8 +1860,8 @@ class AssetsCanvas(Gtk.DrawingArea):
         if response == Gtk.ResponseType.OK:
             new_code = dialog.get_code()
             node.code = new_code
-            print(f"✓ Código atualizado: {node.title}")
-            self.queue_draw()
+            logger.info("Código atualizado: %s", node.title)
+            self.request_redraw()
         dialog.destroy()
 
     def rename_node(self):
@@ -1309,8 +1882,8 @@ class AssetsCanvas(Gtk.DrawingArea):
             new_name = dialog.get_name()
             if new_name:
                 node.title = new_name
-                print(f"✓ Nó renomeado: {new_name}")
-                self.queue_draw()
+                logger.info("Nó renomeado: %s", new_name)
+                self.request_redraw()
         dialog.destroy()
 
     def show_node_properties(self):
@@ -1340,9 +1913,10 @@ class AssetsCanvas(Gtk.DrawingArea):
             max_ports = max(node.num_inputs, node.num_outputs)
             node.body_height = max_ports * node.HEIGHT_PORT + node.PADDING * 2
             node.total_height = node.HEIGHT_HEADER + node.body_height
+            self._index_node(node)
 
-            print(f"✓ Propriedades atualizadas: {node.title}")
-            self.queue_draw()
+            logger.info("Propriedades atualizadas: %s", node.title)
+            self.request_redraw()
         dialog.destroy()
 
     def delete_context_node(self):
@@ -1353,7 +1927,7 @@ class AssetsCanvas(Gtk.DrawingArea):
         node = self.context_menu_node
         self._remove_node(node)
         self.context_menu_node = None
-        self.queue_draw()
+        self.request_redraw()
 
     def save_node_to_library(self):
         """Salva o nó como template na biblioteca"""
@@ -1381,20 +1955,41 @@ class AssetsCanvas(Gtk.DrawingArea):
             success = library.save_node_template(node, info["category"])
 
             if success:
-                print(f"✓ Nó '{info['name']}' salvo na categoria '{info['category']}'")
+                logger.info("Nó '%s' salvo na categoria '%s'", info['name'], info['category'])
 
                 # Recriar painel da biblioteca na janela
                 window = self.get_root()
                 if hasattr(window, '_recreate_library_panel'):
                     window._recreate_library_panel()
 
-            self.queue_draw()
+            self.request_redraw()
         dialog.destroy()
 
 
+class LibraryItem(GObject.Object):
+    """
+    Linha da lista da biblioteca: um header de categoria ou um template de nó.
+    """
+
+    def __init__(self, category, icon, template=None):
+        """
+        Args:
+            category: Nome da categoria
+            icon: Ícone da categoria
+            template: Dict do template (None = linha de header da categoria)
+        """
+        super().__init__()
+        self.category = category
+        self.icon = icon
+        self.template = template
+
+
 class AssetsWindow(Gtk.ApplicationWindow):
     """Janela principal"""
 
+    LIBRARY_WIDTH = 250                 # Largura do painel da biblioteca
+    LIBRARY_ANIMATION_US = 150 * 1000   # Duração da animação de abrir/fechar (µs)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.set_default_size(1200, 700)
@@ -1434,10 +2029,16 @@ class AssetsWindow(Gtk.ApplicationWindow):
 
         # Layout principal com Paned (divisor)
         self.paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
+        self._library_tick_id = None  # Animação do divisor em andamento
 
         # Painel esquerdo - Biblioteca de nós
+        # Dentro de um Revealer: esconder/mostrar não refaz o measure do painel
+        self._library_revealer = Gtk.Revealer(
+            transition_type=Gtk.RevealerTransitionType.NONE, reveal_child=True
+        )
         self.library_panel = self._create_library_panel()
-        self.paned.set_start_child(self.library_panel)
+        self._library_revealer.set_child(self.library_panel)
+        self.paned.set_start_child(self._library_revealer)
         self.paned.set_resize_start_child(False)
         self.paned.set_shrink_start_child(False)
 
@@ -1474,8 +2075,6 @@ class AssetsWindow(Gtk.ApplicationWindow):
         # Setup actions para menu de contexto
         self._setup_actions()
 
-#        print("✓ Janela criada")
-
     def _setup_actions(self):
         """Configura actions para menu de contexto"""
         # Edit Code action
@@ -1504,9 +2103,11 @@ class AssetsWindow(Gtk.ApplicationWindow):
         self.canvas.action_group.add_action(delete_action)
 
     def _create_library_panel(self):
-        """Cria o painel da biblioteca de nós"""
-        from .node_library import get_all_categories, get_nodes_in_category, get_category_icon
-
+        """
+        Cria o painel da biblioteca de nós.
+        A lista de templates só é montada quando o painel aparece pela
+        primeira vez (não custa nada se a biblioteca ficar escondida).
+        """
         # Box principal do painel
         panel_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         panel_box.set_size_request(250, -1)
@@ -1518,8 +2119,9 @@ class AssetsWindow(Gtk.ApplicationWindow):
         panel_header.set_margin_start(12)
         panel_header.set_margin_end(12)
 
-        header_label = Gtk.Label(label="Node Library")
-        header_label.set_markup("<b>Node Library</b>")
+        header_label = Gtk.Label()
+        header_label.set_text(_LIBRARY_HEADER_TEXT)
+        header_label.set_attributes(_LIBRARY_HEADER_ATTRS)
         header_label.set_xalign(0)
         panel_header.append(header_label)
 
@@ -1530,41 +2132,16 @@ class AssetsWindow(Gtk.ApplicationWindow):
         scrolled = Gtk.ScrolledWindow()
         scrolled.set_vexpand(True)
         scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-
-        # Box para as categorias
-        categories_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
-        categories_box.set_margin_top(12)
-        categories_box.set_margin_bottom(12)
-        categories_box.set_margin_start(12)
-        categories_box.set_margin_end(12)
-
-        # Criar seções para cada categoria
-        for category in get_all_categories():
-            icon = get_category_icon(category)
-
-            # Header da categoria
-            category_header = Gtk.Label()
-            category_header.set_markup(f"<b>{icon} {category}</b>")
-            category_header.set_xalign(0)
-            category_header.set_margin_top(6)
-            categories_box.append(category_header)
-
-            # Nós da categoria
-            nodes = get_nodes_in_category(category)
-            for node_template in nodes:
-                node_button = Gtk.Button(label=node_template["name"])
-                node_button.set_has_frame(False)
-                node_button.set_halign(Gtk.Align.START)  # GTK4 usa set_halign
-                node_button.set_tooltip_text(node_template["description"])
-                node_button.connect("clicked", self.on_node_template_clicked, node_template)
-                categories_box.append(node_button)
-
-        scrolled.set_child(categories_box)
         panel_box.append(scrolled)
 
+        # Montar a lista no primeiro "map" do painel
+        self._library_scrolled = scrolled
+        self._library_map_handler = panel_box.connect("map", self._on_library_panel_map)
+
         # Instruções no rodapé
         instructions = Gtk.Label()
-        instructions.set_markup("<small>Click to add node to center</small>")
+        instructions.set_text(_LIBRARY_FOOTER_TEXT)
+        instructions.set_attributes(_LIBRARY_FOOTER_ATTRS)
         instructions.set_margin_top(6)
         instructions.set_margin_bottom(6)
         panel_box.append(Gtk.Separator())
@@ -1572,56 +2149,165 @@ class AssetsWindow(Gtk.ApplicationWindow):
 
         return panel_box
 
+    def _on_library_panel_map(self, panel_box):
+        """Primeira vez que o painel aparece: monta a lista logo depois (idle)"""
+        panel_box.disconnect(self._library_map_handler)
+        self._library_map_handler = None
+
+        scrolled = self._library_scrolled
+
+        def fill_list():
+            scrolled.set_child(self._create_library_list())
+            return GLib.SOURCE_REMOVE
+
+        GLib.idle_add(fill_list)
+
+    def _create_library_list(self):
+        """
+        Cria a lista de templates da biblioteca.
+
+        Returns:
+            Gtk.ListView: Headers de categoria e templates
+        """
+        from .node_library import get_all_categories, get_nodes_in_category, get_category_icon
+
+        # Modelo: headers de categoria e templates numa lista plana
+        store = Gio.ListStore.new(LibraryItem)
+        for category in get_all_categories():
+            icon = get_category_icon(category)
+            store.append(LibraryItem(category, icon))
+            for node_template in get_nodes_in_category(category):
+                store.append(LibraryItem(category, icon, node_template))
+
+        # ListView só cria widgets para as linhas visíveis (e os reaproveita)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_library_item_setup)
+        factory.connect("bind", self._on_library_item_bind)
+
+        list_view = Gtk.ListView(model=Gtk.NoSelection(model=store), factory=factory)
+        list_view.set_single_click_activate(True)
+        list_view.add_css_class("node-template")
+        _install_library_css(list_view.get_display())
+        list_view.set_margin_top(12)
+        list_view.set_margin_bottom(12)
+        list_view.set_margin_start(12)
+        list_view.set_margin_end(12)
+        list_view.connect("activate", self._on_library_item_activate)
+
+        return list_view
+
+    def _on_library_item_setup(self, factory, list_item):
+        """Cria o widget (reaproveitável) de uma linha da biblioteca"""
+        label = Gtk.Label()
+        label.set_xalign(0)
+        list_item.set_child(label)
+
+    def _on_library_item_bind(self, factory, list_item):
+        """Preenche uma linha da biblioteca com o header ou template do item"""
+        item = list_item.get_item()
+        label = list_item.get_child()
+        template = item.template
+
+        if template is None:
+            # Header da categoria
+            label.set_markup(f"<b>{GLib.markup_escape_text(f'{item.icon} {item.category}')}</b>")
+            label.set_tooltip_text(None)
+            label.set_margin_top(6)
+            list_item.set_activatable(False)
+        else:
+            # Template de nó (clique adiciona ao canvas)
+            label.set_text(template["name"])
+            label.set_tooltip_text(template["description"])
+            label.set_margin_top(0)
+            list_item.set_activatable(True)
+
+    def _on_library_item_activate(self, list_view, position):
+        """Clique em uma linha da biblioteca (um único handler para a lista toda)"""
+        item = list_view.get_model().get_item(position)
+        if item.template is not None:
+            self.on_node_template_clicked(item.template)
+
     def on_library_toggle(self, button):
-        """Toggle visibilidade da biblioteca"""
+        """Toggle visibilidade da biblioteca (divisor animado)"""
         if button.get_active():
-            self.library_panel.set_visible(True)
-            self.paned.set_position(250)
+            self._library_revealer.set_reveal_child(True)
+            self._animate_library_position(self.LIBRARY_WIDTH)
         else:
-            self.library_panel.set_visible(False)
-            self.paned.set_position(0)
+            self._animate_library_position(
+                0, on_done=lambda: self._library_revealer.set_reveal_child(False)
+            )
+
+    def _animate_library_position(self, target, on_done=None):
+        """
+        Move o divisor da biblioteca até `target` ao longo de alguns frames
+        (tick callback do frame clock, com ease-out) em vez de pular direto.
+
+        Args:
+            target: Posição final do divisor
+            on_done: Chamado ao fim da animação (opcional)
+        """
+        if self._library_tick_id is not None:
+            self.paned.remove_tick_callback(self._library_tick_id)
+
+        # Durante a animação o painel pode ficar menor que o tamanho mínimo
+        self.paned.set_shrink_start_child(True)
+        start_position = self.paned.get_position()
+        start_time = None
+
+        def tick(paned, frame_clock):
+            nonlocal start_time
+            now = frame_clock.get_frame_time()
+            if start_time is None:
+                start_time = now
+
+            progress = min((now - start_time) / self.LIBRARY_ANIMATION_US, 1.0)
+            eased = 1 - (1 - progress) ** 3  # Ease-out cúbico
+            paned.set_position(round(start_position + (target - start_position) * eased))
 
-    def on_node_template_clicked(self, button, template):
+            if progress < 1.0:
+                return GLib.SOURCE_CONTINUE
+
+            self._library_tick_id = None
+            paned.set_shrink_start_child(False)
+            if on_done is not None:
+                on_done()
+            return GLib.SOURCE_REMOVE
+
+        self._library_tick_id = self.paned.add_tick_callback(tick)
+
+    def on_node_template_clicked(self, template):
         """Quando clica em um template na biblioteca"""
-        from .node_library import create_node_from_template
+        canvas = self.canvas
 
-        # Criar nó no centro do canvas visível
-        # Calcular posição central considerando zoom e pan
-        center_x = (400 - self.canvas.pan_offset_x) / self.canvas.zoom_level
-        center_y = (300 - self.canvas.pan_offset_y) / self.canvas.zoom_level
+        # Criar nó no centro do canvas visível (tamanho real, com zoom e pan)
+        center_x, center_y = canvas.get_view_center()
 
         new_node = create_node_from_template(template, center_x, center_y)
-        self.canvas.nodes.append(new_node)
+        canvas.add_node(new_node)
 
-        # Selecionar o novo nó
-        for node in self.canvas.nodes:
-            node.set_selected(False)
-        new_node.set_selected(True)
-        self.canvas.focused_node_index = len(self.canvas.nodes) - 1
+        # Selecionar o novo nó (só o selecionado anterior é desmarcado)
+        canvas.select_node(new_node)
+        canvas.focused_node = new_node
 
- #       print(f"✓ Adicionado: {template['name']}")
-        self.canvas.queue_draw()
+        canvas.request_redraw()
 
         # Retornar foco para o canvas para atalhos funcionarem
-        self.canvas.grab_focus()
+        canvas.grab_focus()
 
     def _recreate_library_panel(self):
         """Recria o painel da biblioteca (após adicionar novos nós)"""
-        # Remover painel antigo
-        self.paned.set_start_child(None)
-
-        # Criar novo painel
+        # Trocar o painel dentro do Revealer (que continua no Paned)
         self.library_panel = self._create_library_panel()
-        self.paned.set_start_child(self.library_panel)
+        self._library_revealer.set_child(self.library_panel)
 
         # Restaurar visibilidade
         if self.library_button.get_active():
-            self.library_panel.set_visible(True)
-            self.paned.set_position(250)
+            self._library_revealer.set_reveal_child(True)
+            self.paned.set_position(self.LIBRARY_WIDTH)
         else:
-            self.library_panel.set_visible(False)
+            self._library_revealer.set_reveal_child(False)
 
-        print("✓ Biblioteca atualizada")
+        logger.info("Biblioteca atualizada")
 
     def on_run_clicked(self, button):
         """Quando clica no botão Run - executa o grafo em background"""
@@ -1630,9 +2316,12 @@ class AssetsWindow(Gtk.ApplicationWindow):
         # Desabilitar botão durante execução
         button.set_sensitive(False)
 
+        # Plano montado aqui, na main thread; a thread só recebe dados imutáveis
+        plan = self.canvas.get_execution_plan()
+
         def run_in_background():
             # Executar o grafo
-            success = self.canvas.execute_graph()
+            success = self.canvas.execute_graph(plan)
 
             # Re-habilitar botão na main thread
             from gi.repository import GLib
@@ -1657,24 +2346,24 @@ class AssetsWindow(Gtk.ApplicationWindow):
     def on_new_clicked(self, button):
         """Cria novo grafo"""
         # TODO: Perguntar se quer salvar mudanças antes
-        self.canvas.nodes.clear()
-        self.canvas.connections.clear()
+        self.canvas.set_nodes([])
+        self.canvas.set_connections(())
         self.current_file = None
         self.set_title("Assets")
-        self.canvas.queue_draw()
-        print("✓ Novo grafo criado")
+        self.canvas.request_redraw()
+        logger.info("Novo grafo criado")
 
     def on_save_clicked(self, button):
         """Salva grafo atual"""
         if self.current_file:
             # Salvar no arquivo atual
             success = GraphSerializer.save_graph(
-                self.canvas.nodes,
+                self.canvas.nodes_in_z_order(),
                 self.canvas.connections,
                 self.current_file
             )
             if success:
-                print(f"✓ Salvo: {self.current_file}")
+                logger.info("Salvo: %s", self.current_file)
         else:
             # Abrir dialog Save As
             self.on_save_as()
@@ -1709,7 +2398,7 @@ class AssetsWindow(Gtk.ApplicationWindow):
                     filepath += '.assets'
 
                 success = GraphSerializer.save_graph(
-                    self.canvas.nodes,
+                    self.canvas.nodes_in_z_order(),
                     self.canvas.connections,
                     filepath
                 )
@@ -1717,10 +2406,10 @@ class AssetsWindow(Gtk.ApplicationWindow):
                 if success:
                     self.current_file = filepath
                     self.set_title(f"Assets - {Path(filepath).name}")
-                    print(f"✓ Salvo como: {filepath}")
+                    logger.info("Salvo como: %s", filepath)
         except Exception as e:
             if "dismissed" not in str(e).lower():
-                print(f"❌ Erro ao salvar: {e}")
+                logger.error("Erro ao salvar: %s", e)
 
     def on_open_clicked(self, button):
         """Abre grafo de arquivo"""
@@ -1774,22 +2463,21 @@ class AssetsWindow(Gtk.ApplicationWindow):
                             )
                             connections.append(connection)
                         else:
-                            print(f"⚠️  Conexão inválida ignorada: {src_id} -> {dst_id}")
+                            logger.warning("Conexão inválida ignorada: %s -> %s", src_id, dst_id)
 
                     # Atualizar canvas
-                    self.canvas.nodes = nodes
-                    self.canvas.connections = connections
+                    self.canvas.set_nodes(nodes)
+                    self.canvas.set_connections(connections)
                     self.current_file = filepath
                     self.set_title(f"Assets - {Path(filepath).name}")
-                    self.canvas.queue_draw()
+                    self.canvas.request_redraw()
 
-                    print(f"✓ Grafo carregado: {filepath}")
-                    print(f"  - {len(nodes)} nós")
-                    print(f"  - {len(connections)} conexões")
+                    logger.info("Grafo carregado: %s (%d nós, %d conexões)",
+                                filepath, len(nodes), len(connections))
                 else:
-                    print(f"❌ Falha ao carregar: {filepath}")
+                    logger.error("Falha ao carregar: %s", filepath)
         except Exception as e:
             if "dismissed" not in str(e).lower():
-                print(f"❌ Erro ao abrir: {e}")
+                logger.error("Erro ao abrir: %s", e)
                 import traceback
                 traceback.print_exc()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+test_node.py - Testes das partes do Node que não dependem de desenho
+"""
+
+import dataclasses
+import unittest
+
+try:
+    import cairo  # noqa: F401 - node.py cria as fontes com pycairo ao importar
+except ImportError:
+    raise unittest.SkipTest("pycairo não instalado")
+
+from src.node import Node, NodeSnapshot
+
+
+class NodeSnapshotTest(unittest.TestCase):
+    """Testes do NodeSnapshot (cópia usada pelo clipboard)"""
+
+    def test_snapshot_copies_fields(self):
+        node = Node(10, 20, title="Soma", num_inputs=3, num_outputs=2)
+
+        self.assertEqual(
+            node.snapshot(),
+            NodeSnapshot(x=10, y=20, title="Soma", num_inputs=3, num_outputs=2)
+        )
+
+    def test_snapshot_does_not_follow_the_node(self):
+        node = Node(10, 20, title="Soma")
+        snapshot = node.snapshot()
+        node.move_to(300, 400)
+        node.title = "Outro"
+
+        self.assertEqual((snapshot.x, snapshot.y, snapshot.title), (10, 20, "Soma"))
+
+    def test_snapshot_is_immutable(self):
+        snapshot = Node(10, 20).snapshot()
+
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snapshot.x = 0
+
+
+class NodePortHitTest(unittest.TestCase):
+    """Testes do hit test de portas (input_port_at / output_port_at)"""
+
+    RADIUS2 = 12 * 12
+
+    def setUp(self):
+        # Portas de entrada em x=100, y = 115, 145, 175; saída em x=300, y=115
+        self.node = Node(100, 50, num_inputs=3, num_outputs=1)
+
+    def test_hits_every_port_at_its_position(self):
+        node = self.node
+        for i in range(node.num_inputs):
+            x, y = node.get_input_port_position(i)
+            self.assertEqual(node.input_port_at(x, y, self.RADIUS2), i)
+        for i in range(node.num_outputs):
+            x, y = node.get_output_port_position(i)
+            self.assertEqual(node.output_port_at(x, y, self.RADIUS2), i)
+
+    def test_hits_within_radius(self):
+        self.assertEqual(self.node.input_port_at(105, 150, self.RADIUS2), 1)
+        self.assertEqual(self.node.output_port_at(292, 110, self.RADIUS2), 0)
+
+    def test_misses_between_ports(self):
+        self.assertIsNone(self.node.input_port_at(100, 131, self.RADIUS2))
+
+    def test_misses_away_from_port_column(self):
+        self.assertIsNone(self.node.input_port_at(150, 145, self.RADIUS2))
+        self.assertIsNone(self.node.output_port_at(100, 115, self.RADIUS2))
+
+    def test_clamps_to_first_and_last_port(self):
+        self.assertEqual(self.node.input_port_at(100, 105, self.RADIUS2), 0)
+        self.assertEqual(self.node.input_port_at(100, 185, self.RADIUS2), 2)
+        self.assertIsNone(self.node.output_port_at(300, 145, self.RADIUS2))
+
+    def test_node_without_ports(self):
+        node = Node(100, 50, num_inputs=0, num_outputs=0)
+
+        self.assertIsNone(node.input_port_at(100, 115, self.RADIUS2))
+        self.assertIsNone(node.output_port_at(300, 115, self.RADIUS2))
+
+
+class NodeFunctionTest(unittest.TestCase):
+    """Testes do get_function (código do nó compilado em cache)"""
+
+    def test_runs_code_as_function_body(self):
+        node = Node(0, 0)
+        node.code = "a, b = inputs\nreturn a + b"
+
+        self.assertEqual(node.get_function()((2, 3)), 5)
+
+    def test_reuses_compilation_until_code_changes(self):
+        node = Node(0, 0)
+        node.code = "return inputs[0]"
+        first = node.get_function()
+
+        self.assertIs(node.get_function().__code__, first.__code__)
+
+        node.code = "return inputs[0] * 2"
+        second = node.get_function()
+
+        self.assertIsNot(second.__code__, first.__code__)
+        self.assertEqual(second((4,)), 8)
+
+    def test_each_call_gets_fresh_globals(self):
+        node = Node(0, 0)
+        node.code = ("global calls\n"
+                     "calls = globals().get('calls', 0) + 1\n"
+                     "return calls")
+
+        self.assertEqual(node.get_function()(()), 1)
+        self.assertEqual(node.get_function()(()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
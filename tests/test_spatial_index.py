@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+test_spatial_index.py - Testes dos índices espaciais do canvas
+"""
+
+import unittest
+
+try:
+    import numpy  # noqa: F401 - spatial_index depende de NumPy
+except ImportError:
+    raise unittest.SkipTest("NumPy não instalado")
+
+from src.spatial_index import RectArray, SpatialHash
+
+
+class SpatialHashTest(unittest.TestCase):
+    """Testes do SpatialHash (grade uniforme de retângulos)"""
+
+    def setUp(self):
+        self.index = SpatialHash(cell_size=100)
+
+    def test_query_point_returns_items_in_cell(self):
+        self.index.insert("a", 10, 10, 50, 50)
+        self.index.insert("b", 210, 10, 250, 50)
+
+        self.assertEqual(set(self.index.query_point(20, 20)), {"a"})
+        self.assertEqual(set(self.index.query_point(220, 20)), {"b"})
+        self.assertEqual(set(self.index.query_point(150, 20)), set())
+
+    def test_item_spanning_cells_is_found_in_each(self):
+        self.index.insert("a", 50, 50, 250, 150)
+
+        for x, y in ((60, 60), (150, 60), (240, 140)):
+            self.assertIn("a", self.index.query_point(x, y))
+
+    def test_negative_coordinates(self):
+        self.index.insert("a", -150, -150, -110, -110)
+
+        self.assertIn("a", self.index.query_point(-120, -120))
+        self.assertNotIn("a", self.index.query_point(20, 20))
+
+    def test_insert_again_moves_item(self):
+        self.index.insert("a", 10, 10, 50, 50)
+        self.index.insert("a", 310, 310, 350, 350)
+
+        self.assertNotIn("a", self.index.query_point(20, 20))
+        self.assertIn("a", self.index.query_point(320, 320))
+        self.assertEqual(len(self.index), 1)
+
+    def test_remove(self):
+        self.index.insert("a", 10, 10, 50, 50)
+        self.index.remove("a")
+        self.index.remove("a")  # Remover de novo é ignorado
+
+        self.assertNotIn("a", self.index)
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(set(self.index.query_point(20, 20)), set())
+
+    def test_clear(self):
+        self.index.insert("a", 10, 10, 50, 50)
+        self.index.insert("b", 210, 10, 250, 50)
+        self.index.clear()
+
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(set(self.index.query_point(20, 20)), set())
+
+
+class RectArrayTest(unittest.TestCase):
+    """Testes do RectArray (retângulos em arrays NumPy)"""
+
+    def setUp(self):
+        self.rects = RectArray(capacity=2)
+
+    def test_query_rect_returns_intersecting_items(self):
+        self.rects.set("a", 0, 0, 10, 10)
+        self.rects.set("b", 100, 100, 110, 110)
+
+        self.assertEqual(set(self.rects.query_rect(5, 5, 50, 50)), {"a"})
+        self.assertEqual(set(self.rects.query_rect(-10, -10, 200, 200)), {"a", "b"})
+        self.assertEqual(self.rects.query_rect(20, 20, 90, 90), [])
+
+    def test_touching_edges_intersect(self):
+        self.rects.set("a", 0, 0, 10, 10)
+
+        self.assertEqual(self.rects.query_rect(10, 10, 20, 20), ["a"])
+
+    def test_set_again_updates_rect(self):
+        self.rects.set("a", 0, 0, 10, 10)
+        self.rects.set("a", 100, 100, 110, 110)
+
+        self.assertEqual(len(self.rects), 1)
+        self.assertEqual(self.rects.query_rect(0, 0, 10, 10), [])
+        self.assertEqual(self.rects.query_rect(100, 100, 105, 105), ["a"])
+
+    def test_grows_past_capacity(self):
+        for i in range(10):
+            self.rects.set(i, i * 20, 0, i * 20 + 10, 10)
+
+        self.assertEqual(len(self.rects), 10)
+        self.assertEqual(set(self.rects.query_rect(0, 0, 200, 10)), set(range(10)))
+
+    def test_remove_moves_last_row_into_hole(self):
+        self.rects.set("a", 0, 0, 10, 10)
+        self.rects.set("b", 100, 0, 110, 10)
+        self.rects.set("c", 200, 0, 210, 10)
+        self.rects.remove("a")
+        self.rects.remove("a")  # Remover de novo é ignorado
+
+        self.assertNotIn("a", self.rects)
+        self.assertEqual(len(self.rects), 2)
+        self.assertEqual(self.rects.query_rect(200, 0, 210, 10), ["c"])
+        self.assertEqual(set(self.rects.query_rect(0, 0, 300, 10)), {"b", "c"})
+
+    def test_clear(self):
+        self.rects.set("a", 0, 0, 10, 10)
+        self.rects.clear()
+
+        self.assertEqual(len(self.rects), 0)
+        self.assertEqual(self.rects.query_rect(0, 0, 10, 10), [])
+
+
+if __name__ == "__main__":
+    unittest.main()